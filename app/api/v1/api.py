@@ -11,6 +11,7 @@ from app.api.v1.endpoints import (
     person,
     person_event,
     person_type,
+    attendance,
 )
 
 api_router = APIRouter()
@@ -38,3 +39,5 @@ api_router.include_router(
     person_type.router, prefix="/person-types", tags=["Person Types"])
 api_router.include_router(
     person_event.router, prefix="/person-events", tags=["Person Events"])
+api_router.include_router(
+    attendance.router, prefix="/attendance", tags=["Attendance"])
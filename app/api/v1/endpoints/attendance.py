@@ -0,0 +1,44 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.schemas.attendance import AttendanceDaily
+import app.services.attendance as attendance_service
+from app.models import User
+from app.schemas.common import PaginationResponse
+
+router = APIRouter()
+
+
+@router.get("", response_model=PaginationResponse[AttendanceDaily])
+async def get_attendance(
+    *,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1),
+    after: Optional[str] = Query(None, description="nextCursor of the previous page; overrides page"),
+    with_total: bool = Query(True, description="Set false to skip counting totalRecords"),
+    unit_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    person_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """
+    Retrieve daily first-in/last-out attendance per person.
+    """
+    return await attendance_service.get_attendance(
+        db,
+        page=page,
+        page_size=page_size,
+        after=after,
+        with_total=with_total,
+        unit_id=unit_id,
+        department_id=department_id,
+        person_id=person_id,
+        start_date=start_date,
+        end_date=end_date
+    )
@@ -1,10 +1,12 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import get_current_active_user
-from app.schemas.person import Person, PersonCreate, PersonUpdate, FaceSearchRequest, FaceSearchResponse
+from app.schemas.person import Person, PersonCreate, PersonUpdate, FaceSearchRequest, FaceSearchResponse, FaceSearchBatchRequest, FaceSearchBatchResponse, PersonImportResponse
 import app.services.person as person_service
+from app.services.person_import import import_persons
+from app.utils.helpers import iter_json_rows
 from app.models import User
 from app.schemas.common import PaginationResponse
 
@@ -56,6 +58,20 @@ async def create_new_person(
     return person
 
 
+@router.post("/import", response_model=PersonImportResponse)
+async def import_new_persons(
+    *,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    request: Request
+):
+    """
+    Bulk create persons from a JSON array or an NDJSON stream of person rows
+    (same fields as POST /persons). Returns one result per row.
+    """
+    return await import_persons(db, iter_json_rows(request))
+
+
 @router.get("/{person_id}", response_model=Person)
 async def read_person(
     *,
@@ -157,3 +173,30 @@ async def search_face_camera(
         num_result=search_request.num_result,
         quality=search_request.quality
     )
+
+
+@router.post("/search-face-batch", response_model=FaceSearchBatchResponse)
+async def search_face_batch(
+    *,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    search_request: FaceSearchBatchRequest
+):
+    """
+    Search for persons by several face images sharing one unit and department
+    """
+    if not all(search_request.base64_images):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Base64 images must not be empty"
+        )
+
+    return await person_service.search_face_batch(
+        db,
+        base64_images=search_request.base64_images,
+        unit_id=search_request.unit_id,
+        department_id=search_request.department_id,
+        threshold=search_request.threshold,
+        num_result=search_request.num_result,
+        quality=search_request.quality
+    )
@@ -1,13 +1,23 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.core.database import get_db
 from app.core.security import get_current_active_user
-from app.schemas.person_event import PersonEvent, PersonEventCreate
+from app.schemas.person_event import (
+    PersonEvent,
+    PersonEventCreate,
+    PersonEventBulkResponse,
+    PersonEventQueued,
+    PersonEventDeadLetter,
+)
+import app.services.event_queue as event_queue
 import app.services.person_event as person_event_service
 from app.models import User
 from app.schemas.common import PaginationResponse
+from app.utils.responses import FastJSONResponse, parse_fields
+from app.utils.helpers import iter_json_rows
 
 router = APIRouter()
 
@@ -19,6 +29,10 @@ async def get_person_events(
     _: User = Depends(get_current_active_user),
     page: int = Query(1, ge=1),
     page_size: int = Query(100, ge=1),
+    after: Optional[str] = Query(None, description="nextCursor of the previous page; overrides page"),
+    with_total: bool = Query(True, description="Set false to skip counting totalRecords"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. event_id,person_id,access_time"),
     person_id: Optional[str] = None,
     device_id: Optional[int] = None,
     area_id: Optional[int] = None,
@@ -33,10 +47,13 @@ async def get_person_events(
     """
     Retrieve person events with various filters.
     """
-    return await person_event_service.get_person_events(
+    result = await person_event_service.get_person_events(
         db,
         page=page,
         page_size=page_size,
+        after=after,
+        with_total=with_total,
+        fields=parse_fields(fields),
         person_id=person_id,
         device_id=device_id,
         area_id=area_id,
@@ -48,9 +65,16 @@ async def get_person_events(
         start_time=start_time,
         end_time=end_time
     )
+    # Items are already validated (or projected) by the service
+    return FastJSONResponse(result)
 
 
-@router.post("", response_model=PersonEvent)
+@router.post(
+    "",
+    response_model=PersonEvent,
+    responses={202: {"model": PersonEventQueued,
+                     "description": "Queued for write-behind (EVENT_WRITE_MODE redis/memory)"}}
+)
 async def create_new_person_event(
     *,
     db: AsyncSession = Depends(get_db),
@@ -60,10 +84,43 @@ async def create_new_person_event(
     """
     Create new person event.
     """
+    if event_queue.is_write_behind():
+        event_id = await event_queue.enqueue_event(event_in)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=PersonEventQueued(event_id=event_id).model_dump()
+        )
     event = await person_event_service.create_person_event(db, event_in)
     return event
 
 
+@router.post("/bulk", response_model=PersonEventBulkResponse)
+async def create_person_events_bulk(
+    *,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    request: Request
+):
+    """
+    Create many person events from a JSON array or an NDJSON stream.
+    Returns a created/duplicate/failed status per event.
+    """
+    return await person_event_service.create_person_events_bulk(
+        db, iter_json_rows(request))
+
+
+@router.get("/dead-letter", response_model=List[PersonEventDeadLetter])
+async def read_dead_letter_events(
+    *,
+    _: User = Depends(get_current_active_user),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Get the most recent queued events rejected by the write-behind writer.
+    """
+    return await event_queue.get_dead_letters(limit)
+
+
 @router.get("/{event_id}", response_model=PersonEvent)
 async def read_person_event(
     *,
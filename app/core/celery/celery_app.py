@@ -17,4 +17,31 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    beat_schedule={
+        'compact-sessions': {
+            'task': 'app.core.celery.tasks.compact_sessions',
+            'schedule': settings.SESSION_COMPACTION_INTERVAL,
+        },
+        'ensure-event-partitions': {
+            'task': 'app.core.celery.tasks.ensure_event_partitions',
+            'schedule': settings.EVENT_PARTITION_INTERVAL,
+        },
+        'apply-event-retention': {
+            'task': 'app.core.celery.tasks.apply_event_retention',
+            'schedule': settings.EVENT_RETENTION_INTERVAL,
+        },
+        'rollup-attendance': {
+            'task': 'app.core.celery.tasks.rollup_attendance',
+            'schedule': settings.ATTENDANCE_ROLLUP_INTERVAL,
+        },
+    },
 )
+
+# Redis write-behind only; other modes would publish a no-op task every second
+if settings.EVENT_WRITE_MODE == "redis":
+    celery_app.conf.beat_schedule['drain-event-queue'] = {
+        'task': 'app.core.celery.tasks.drain_event_queue',
+        'schedule': settings.EVENT_DRAIN_INTERVAL,
+        # A missed run is covered by the next one
+        'options': {'expires': settings.EVENT_DRAIN_INTERVAL},
+    }
@@ -1,6 +1,10 @@
 from app.core.celery.celery_app import celery_app
 from app.utils.helpers import save_base64_image_sync
 from app.core.config import get_settings
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import NullPool
+from contextlib import asynccontextmanager
+import asyncio
 import time
 
 settings = get_settings()
@@ -25,3 +29,129 @@ def save_event_image(base64_image: str, path: str, filename: str) -> str:
     except Exception as e:
         print(f"Error saving image: {str(e)}")
         return None
+
+
+@asynccontextmanager
+async def _worker_db():
+    """Database session for one task run
+
+    A worker process runs each task in a fresh event loop, so skip the app's
+    pooled engine and the cached Redis client bound to an earlier loop.
+    """
+    from app.core.redis import close_redis
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            yield db
+    finally:
+        await engine.dispose()
+        await close_redis()
+
+
+async def _compact_sessions() -> int:
+    from app.services.session import compact_sessions
+
+    async with _worker_db() as db:
+        return await compact_sessions(
+            db,
+            batch_size=settings.SESSION_COMPACTION_BATCH_SIZE,
+            max_batches=settings.SESSION_COMPACTION_MAX_BATCHES
+        )
+
+
+@celery_app.task
+def compact_sessions() -> int:
+    """
+    Celery beat task that purges soft-deleted and expired sessions
+
+    Returns:
+        int: Number of session rows removed
+    """
+    started = time.perf_counter()
+    removed = asyncio.run(_compact_sessions())
+    print(f"Session compaction removed {removed} rows in "
+          f"{time.perf_counter() - started:.2f}s")
+    return removed
+
+
+async def _drain_event_queue() -> int:
+    from app.services.event_queue import drain_redis_queue
+
+    async with _worker_db() as db:
+        return await drain_redis_queue(db, settings.EVENT_DRAIN_MAX_BATCHES)
+
+
+@celery_app.task(ignore_result=True)
+def drain_event_queue() -> int:
+    """
+    Celery beat task that writes events queued in Redis (EVENT_WRITE_MODE=redis)
+
+    Returns:
+        int: Number of events drained
+    """
+    if settings.EVENT_WRITE_MODE != "redis":
+        return 0
+    return asyncio.run(_drain_event_queue())
+
+
+async def _ensure_event_partitions() -> list:
+    from app.services.event_partitions import ensure_event_partitions
+
+    async with _worker_db() as db:
+        return await ensure_event_partitions(db, settings.EVENT_PARTITION_MONTHS_AHEAD)
+
+
+@celery_app.task
+def ensure_event_partitions() -> list:
+    """
+    Celery beat task that creates upcoming monthly person_event partitions
+
+    Returns:
+        list: Names of the partitions created
+    """
+    created = asyncio.run(_ensure_event_partitions())
+    if created:
+        print(f"Created person_event partitions: {', '.join(created)}")
+    return created
+
+
+async def _apply_event_retention() -> dict:
+    from app.services.event_retention import apply_event_retention
+
+    async with _worker_db() as db:
+        return await apply_event_retention(db)
+
+
+@celery_app.task
+def apply_event_retention() -> dict:
+    """
+    Celery beat task that archives and removes expired person events and images
+
+    Returns:
+        dict: Retention report including bytes reclaimed
+    """
+    started = time.perf_counter()
+    report = asyncio.run(_apply_event_retention())
+    print(f"Event retention reclaimed {report['bytes_reclaimed']} bytes "
+          f"({report['deleted']} events, {report['directories_removed']} image "
+          f"directories) in {time.perf_counter() - started:.2f}s")
+    return report
+
+
+async def _rollup_attendance() -> int:
+    from app.services.attendance import rollup_recent_attendance
+
+    async with _worker_db() as db:
+        return await rollup_recent_attendance(db)
+
+
+@celery_app.task
+def rollup_attendance() -> int:
+    """
+    Celery beat task that rebuilds recent attendance_daily rows from person_event
+
+    Returns:
+        int: Number of attendance rows written
+    """
+    return asyncio.run(_rollup_attendance())
@@ -1,7 +1,8 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+import os
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 import dotenv
 import yaml
 from pydantic import BaseModel
@@ -10,8 +11,9 @@ from datetime import datetime, timedelta
 # Get the root directory of the project
 ROOT_DIR = Path(__file__).parent.parent.parent.parent
 
-# Check if env file exists
-ENV_FILE = ROOT_DIR / "resources" / "configs" / ".env"
+# Check if env file exists; APP_ENV_FILE points elsewhere (e.g. tests)
+ENV_FILE = Path(os.environ.get(
+    "APP_ENV_FILE", ROOT_DIR / "resources" / "configs" / ".env"))
 if not ENV_FILE.exists():
     raise FileNotFoundError(
         f"Environment file not found at {ENV_FILE}. Please create .env file based on .env.example"
@@ -52,6 +54,17 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 5
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ALGORITHM: str = "HS256"
+    AUTH_MODE: str = "session"  # "session" (database lookup) or "stateless" (signed claims + denylist; needs Redis when APP_WORKERS > 1)
+    SESSION_CACHE_ENABLED: bool = False  # Cache authenticated sessions by token hash; needs Redis when APP_WORKERS > 1
+    SESSION_CACHE_SIZE: int = 10000  # Max sessions held in the in-process LRU
+    SESSION_CACHE_LOCAL_TTL: int = 30  # Seconds a worker trusts its own copy; revocations apply within SESSION_DENYLIST_REFRESH
+    SESSION_CACHE_REDIS_ENABLED: bool = False  # Share cached sessions and revocations between workers
+    SESSION_CACHE_PREFIX: str = "session_cache"
+    SESSION_DENYLIST_KEY: str = "session_denylist"
+    PRIVILEGE_CACHE_TTL: int = 60  # Seconds a worker reuses a user's privilege set
+    PRIVILEGE_CACHE_REDIS_ENABLED: bool = False  # Share privilege invalidations between workers; needed when APP_WORKERS > 1
+    PRIVILEGE_VERSION_KEY: str = "privilege_cache:version"
+    SESSION_DENYLIST_REFRESH: float = 5.0  # Seconds between pulls of revocations from Redis
 
     # AI Configuration
     AI_SERVICE_BASE_URL: str = "http://192.168.83.12:62070"
@@ -59,7 +72,67 @@ class Settings(BaseSettings):
     DETECT_FACE_METHOD: str = "POST"
     DETECT_FACE_HEADERS: str = "Content-Type: application/json"
     DETECT_FACE_BODY: str = "{\"base64_image\": \"\"}"
+    DETECT_FACE_BATCH_URI: str = ""  # Batch detect endpoint, empty disables micro-batching
+    DETECT_FACE_BATCH_MAX_SIZE: int = 16
+    DETECT_FACE_BATCH_MAX_WAIT_MS: float = 5.0
     MASK_THRESHOLD_SUB: float = 0.05
+    AI_HTTP_TIMEOUT: float = 10.0
+    AI_HTTP_MAX_CONNECTIONS: int = 100  # Cap on open connections to the AI host
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AI_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    AI_HTTP2_ENABLED: bool = False  # Requires the 'h2' package
+
+    # Event Ingest Configuration
+    EVENT_BULK_BATCH_SIZE: int = 1000  # Events per INSERT ... ON CONFLICT statement
+    EVENT_WRITE_MODE: str = "sync"  # "sync", "redis" (Celery drains) or "memory" (in-process writer)
+    EVENT_QUEUE_KEY: str = "person_event:queue"
+    EVENT_DEAD_LETTER_KEY: str = "person_event:dead_letter"
+    EVENT_DEAD_LETTER_MAX_SIZE: int = 10000
+    EVENT_QUEUE_MAX_SIZE: int = 100000  # POST /person-events answers 503 beyond this
+    EVENT_DRAIN_BATCH_SIZE: int = 500
+    EVENT_DRAIN_MAX_BATCHES: int = 100  # Per Celery run
+    EVENT_DRAIN_INTERVAL: float = 1.0  # Seconds between Celery drain runs
+    EVENT_PARTITION_MONTHS_AHEAD: int = 3  # Monthly person_event partitions created in advance
+    EVENT_PARTITION_INTERVAL: float = 86400.0  # Seconds between partition maintenance runs
+
+    # Event Retention Configuration (days, 0 keeps events forever)
+    EVENT_RETENTION_DAYS: int = 0
+    EVENT_RETENTION_UNIT_DAYS: Dict[int, int] = {}  # Per-unit overrides
+    EVENT_RETENTION_TYPE_DAYS: Dict[int, int] = {}  # Per-person-type overrides, win over units
+    EVENT_RETENTION_BATCH_SIZE: int = 5000  # Rows archived and deleted per transaction
+    EVENT_RETENTION_MAX_BATCHES: int = 200  # Cap on batches per run
+    EVENT_RETENTION_INTERVAL: float = 86400.0  # Seconds between retention runs
+    EVENT_ARCHIVE_PATH: str = "archive"  # Under STORAGE_PATH unless absolute
+    EVENT_ARCHIVE_FORMAT: str = "ndjson"  # "ndjson" (gzip) or "parquet" (needs pyarrow)
+
+    # Attendance Summary Configuration
+    ATTENDANCE_INCREMENTAL: bool = True  # Update attendance_daily as events are inserted
+    ATTENDANCE_ROLLUP_DAYS: int = 2  # Recent days rebuilt from person_event by Celery
+    ATTENDANCE_ROLLUP_INTERVAL: float = 900.0  # Seconds between rollup runs
+
+    # Person Import Configuration
+    PERSON_IMPORT_BATCH_SIZE: int = 200  # Rows validated and inserted per transaction
+    PERSON_IMPORT_CONCURRENCY: int = 8  # Parallel face detections and image writes
+
+    # Face Gallery Configuration
+    FACE_GALLERY_ENABLED: bool = True  # Keep person embeddings in memory for search; needs gallery sync when APP_WORKERS > 1
+    FACE_GALLERY_SYNC_ENABLED: bool = False  # Share gallery deltas between workers over Redis
+    FACE_GALLERY_CHANNEL: str = "face_gallery:deltas"
+    FACE_GALLERY_VERSION_KEY: str = "face_gallery:version"
+    SEARCH_INCLUDE_DESCENDANTS: bool = False  # Also search child units and sub-departments
+    DEPARTMENT_CACHE_TTL: int = 60  # Seconds before the cached unit/department tree is reloaded
+    FACE_SEARCH_MODE: str = "exact"  # "exact" or "ivf" (approximate)
+    FACE_IVF_MIN_SIZE: int = 20000  # Galleries smaller than this are searched exactly
+    FACE_IVF_NLIST: int = 0  # Number of coarse centroids, 0 = sqrt(gallery size)
+    FACE_IVF_NPROBE: int = 16  # Inverted lists scored per search
+    FACE_IVF_UNIT_NPROBE: Dict[int, int] = {}  # Per-unit nprobe overrides
+    PGVECTOR_ENABLED: bool = False  # Rank faces in Postgres when the vector extension is installed
+    PGVECTOR_EF_SEARCH: int = 100  # HNSW candidate list size per query
+
+    # Pagination Configuration
+    PAGINATION_COUNT_CACHE_TTL: float = 10.0  # Seconds a filtered count is reused, 0 disables
+    PAGINATION_COUNT_CACHE_SIZE: int = 1000
+    PAGINATION_ESTIMATE_MIN_ROWS: int = 1000000  # Unfiltered tables above this use reltuples
 
     # Database Configuration
     POSTGRES_USER: str
@@ -85,6 +158,10 @@ class Settings(BaseSettings):
     # Celery Configuration
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    SESSION_COMPACTION_INTERVAL: float = 3600.0  # Seconds between beat runs
+    SESSION_COMPACTION_BATCH_SIZE: int = 1000  # Rows deleted per transaction
+    SESSION_COMPACTION_MAX_BATCHES: int = 100  # Cap on batches per run
+    SESSION_RETENTION_DAYS: int = 0  # Keep ended sessions this long for auditing
 
     # CORS Settings
     CORS_ORIGINS: List[str] = ["*"]
@@ -94,8 +171,19 @@ class Settings(BaseSettings):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self._check_auth_mode()
         self._load_privileges()
 
+    def _check_auth_mode(self):
+        """Stateless tokens can only be revoked through the denylist, which
+        reaches the other workers over Redis"""
+        if (self.AUTH_MODE == "stateless" and self.APP_WORKERS > 1
+                and not self.SESSION_CACHE_REDIS_ENABLED):
+            raise ValueError(
+                "AUTH_MODE=stateless with APP_WORKERS > 1 requires "
+                "SESSION_CACHE_REDIS_ENABLED=true"
+            )
+
     def _load_privileges(self):
         """Load privileges from YAML file"""
         privilege_file = ROOT_DIR / "resources" / "configs" / "privileges.yaml"
@@ -138,6 +226,10 @@ class Settings(BaseSettings):
     def get_event_path(self) -> str:
         return f"{self.STORAGE_PATH}/{self.EVENT_PATH}"
 
+    @property
+    def get_event_archive_path(self) -> str:
+        return os.path.join(self.STORAGE_PATH, self.EVENT_ARCHIVE_PATH)
+
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -0,0 +1,3 @@
+from .redis_client import get_redis, close_redis
+
+__all__ = ["get_redis", "close_redis"]
@@ -0,0 +1,24 @@
+from typing import Optional
+from redis.asyncio import Redis
+from ..config import get_settings
+
+settings = get_settings()
+
+# Shared async client on the Celery broker Redis
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """Get the process-wide async Redis client"""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.CELERY_BROKER_URL)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the process-wide async Redis client"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -4,10 +4,12 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.services.user import get_user_by_id
-from .token_utils import verify_token
+from .token_utils import verify_token, is_token_expired, hash_token
 from app.models.user import User
 from app.core.config import get_settings
 from app.services import session as session_service
+from .session_cache import get_cached_session, cache_session, payload_to_user
+from .session_denylist import is_session_denied
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -24,7 +26,15 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    session = await session_service.get_session_by_access_token(db, token)
+    if settings.AUTH_MODE == "stateless":
+        return await get_stateless_user(token, credentials_exception)
+
+    token_hash = hash_token(token)
+    cached = await get_cached_session(token_hash)
+    if cached:
+        return payload_to_user(cached)
+
+    session = await session_service.get_session_by_access_token_hash(db, token_hash)
     if not session:
         raise credentials_exception
 
@@ -32,9 +42,26 @@ async def get_current_user(
     if not user:
         raise credentials_exception
 
+    await cache_session(token_hash, session, user)
     return user
 
 
+async def get_stateless_user(token: str, credentials_exception: HTTPException) -> User:
+    """Authenticate from the signed claims alone, checking only the revocation denylist"""
+    payload = verify_token(token)
+    if not payload or payload.get("type") != "access" or is_token_expired(payload):
+        raise credentials_exception
+
+    session_id = payload.get("session_id")
+    if not session_id or not payload.get("sub"):
+        raise credentials_exception
+    if await is_session_denied(session_id):
+        raise credentials_exception
+
+    # Deactivating or deleting a user revokes their sessions, so a valid token implies active
+    return User(id=int(payload["sub"]), username=payload.get("username"), status=True)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -71,14 +98,16 @@ def has_any_permission(payload: dict, permissions: List[str]) -> bool:
 
 def require_permissions(required_permissions: List[str]):
     """Dependency for requiring specific permissions"""
+    required = frozenset(required_permissions)
+
     async def permission_dependency(
         current_user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
     ) -> User:
-        from app.services.user import get_user_privileges
+        from app.services.privilege_cache import get_user_privilege_set
 
-        user_permissions = await get_user_privileges(db, current_user.id)
-        if not set(required_permissions).intersection(user_permissions):
+        user_permissions = await get_user_privilege_set(db, current_user.id)
+        if user_permissions.isdisjoint(required):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
@@ -0,0 +1,166 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+from redis.exceptions import RedisError
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+from app.core.redis import get_redis
+from .session_denylist import is_session_denied
+from app.models.session import Session
+from app.models.user import User
+
+settings = get_settings()
+logger = setup_logging()
+
+# User columns kept in the cached snapshot (never the password hash)
+USER_FIELDS = ("id", "username", "full_name", "unit_id", "status",
+               "created_at", "updated_at", "deleted_at")
+DATETIME_FIELDS = {"created_at", "updated_at", "deleted_at"}
+
+# token hash -> (local expiry in monotonic seconds, payload)
+_local: "OrderedDict[str, tuple]" = OrderedDict()
+# user id -> token hashes cached locally
+_local_by_user: Dict[int, Set[str]] = {}
+
+
+def is_cache_enabled() -> bool:
+    """Caching needs Redis when several workers serve requests
+
+    Without it a logout or revocation would only clear the cache of the
+    worker that handled it, and the other workers would keep accepting the
+    token.
+    """
+    if not settings.SESSION_CACHE_ENABLED:
+        return False
+    return settings.SESSION_CACHE_REDIS_ENABLED or settings.APP_WORKERS <= 1
+
+
+def _session_key(token_hash: str) -> str:
+    return f"{settings.SESSION_CACHE_PREFIX}:token:{token_hash}"
+
+
+def _user_key(user_id: int) -> str:
+    return f"{settings.SESSION_CACHE_PREFIX}:user:{user_id}"
+
+
+def _to_payload(session: Session, user: User) -> dict:
+    snapshot = {}
+    for field in USER_FIELDS:
+        value = getattr(user, field)
+        snapshot[field] = value.isoformat() if isinstance(value, datetime) else value
+    return {
+        "session_id": session.id,
+        "user_id": session.user_id,
+        "expires_at": session.expires_at.isoformat(),
+        "user": snapshot,
+    }
+
+
+def payload_to_user(payload: dict) -> User:
+    """Build a detached User from a cached snapshot"""
+    data = dict(payload["user"])
+    for field in DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return User(**data)
+
+
+def _is_expired(payload: dict) -> bool:
+    return datetime.fromisoformat(payload["expires_at"]) <= settings.datetime_now
+
+
+def _store_local(token_hash: str, payload: dict) -> None:
+    _local[token_hash] = (time.monotonic() + settings.SESSION_CACHE_LOCAL_TTL, payload)
+    _local.move_to_end(token_hash)
+    _local_by_user.setdefault(payload["user_id"], set()).add(token_hash)
+    while len(_local) > settings.SESSION_CACHE_SIZE:
+        evicted_hash, (_, evicted) = _local.popitem(last=False)
+        _local_by_user.get(evicted["user_id"], set()).discard(evicted_hash)
+
+
+def _drop_local(token_hash: str) -> None:
+    entry = _local.pop(token_hash, None)
+    if entry:
+        _local_by_user.get(entry[1]["user_id"], set()).discard(token_hash)
+
+
+async def get_cached_session(token_hash: str) -> Optional[dict]:
+    """Get a cached session/user snapshot for a token hash"""
+    if not is_cache_enabled():
+        return None
+
+    entry = _local.get(token_hash)
+    if entry:
+        local_expiry, payload = entry
+        # Revocations on other workers only reach this copy through the denylist
+        if (local_expiry > time.monotonic() and not _is_expired(payload)
+                and not await is_session_denied(payload["session_id"])):
+            _local.move_to_end(token_hash)
+            return payload
+        _drop_local(token_hash)
+
+    if not settings.SESSION_CACHE_REDIS_ENABLED:
+        return None
+    try:
+        raw = await get_redis().get(_session_key(token_hash))
+    except RedisError as e:
+        logger.warning(f"Session cache read failed: {str(e)}")
+        return None
+    if not raw:
+        return None
+    payload = json.loads(raw)
+    if _is_expired(payload):
+        return None
+    _store_local(token_hash, payload)
+    return payload
+
+
+async def cache_session(token_hash: str, session: Session, user: User) -> dict:
+    """Cache a session and user snapshot until the access token expires"""
+    payload = _to_payload(session, user)
+    if not is_cache_enabled():
+        return payload
+
+    _store_local(token_hash, payload)
+    if settings.SESSION_CACHE_REDIS_ENABLED:
+        ttl = int((session.expires_at - settings.datetime_now).total_seconds())
+        if ttl > 0:
+            try:
+                async with get_redis().pipeline(transaction=False) as pipe:
+                    pipe.set(_session_key(token_hash), json.dumps(payload), ex=ttl)
+                    pipe.sadd(_user_key(session.user_id), token_hash)
+                    pipe.expire(_user_key(session.user_id),
+                                settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+                    await pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Session cache write failed: {str(e)}")
+    return payload
+
+
+async def evict_sessions(token_hashes: Iterable[str]) -> None:
+    """Purge cached sessions by token hash"""
+    token_hashes = list(token_hashes)
+    for token_hash in token_hashes:
+        _drop_local(token_hash)
+    if not token_hashes or not settings.SESSION_CACHE_REDIS_ENABLED:
+        return
+    try:
+        await get_redis().delete(*[_session_key(h) for h in token_hashes])
+    except RedisError as e:
+        logger.warning(f"Session cache eviction failed: {str(e)}")
+
+
+async def evict_user_sessions(user_id: int) -> None:
+    """Purge every cached session of a user"""
+    token_hashes = set(_local_by_user.pop(user_id, set()))
+    if settings.SESSION_CACHE_REDIS_ENABLED:
+        try:
+            redis = get_redis()
+            members = await redis.smembers(_user_key(user_id))
+            token_hashes.update(m.decode() if isinstance(m, bytes) else m for m in members)
+            await redis.delete(_user_key(user_id))
+        except RedisError as e:
+            logger.warning(f"Session cache eviction failed: {str(e)}")
+    await evict_sessions(token_hashes)
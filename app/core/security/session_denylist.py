@@ -0,0 +1,79 @@
+import calendar
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+from redis.exceptions import RedisError
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+from app.core.redis import get_redis
+
+settings = get_settings()
+logger = setup_logging()
+
+# session id -> epoch seconds after which the entry is useless (token expired)
+_denied: Dict[int, float] = {}
+_last_refresh: float = 0.0
+
+
+def to_epoch(value: datetime) -> float:
+    """Epoch seconds of a naive settings.datetime_now-style timestamp"""
+    return float(calendar.timegm(value.timetuple()))
+
+
+def _now() -> float:
+    return to_epoch(settings.datetime_now)
+
+
+def _prune(now: float) -> None:
+    for session_id in [k for k, until in _denied.items() if until <= now]:
+        del _denied[session_id]
+
+
+async def _refresh() -> None:
+    """Pull revocations made by other workers, at most once per refresh interval"""
+    global _last_refresh
+    if not settings.SESSION_CACHE_REDIS_ENABLED:
+        return
+    if time.monotonic() - _last_refresh < settings.SESSION_DENYLIST_REFRESH:
+        return
+    _last_refresh = time.monotonic()
+
+    now = _now()
+    try:
+        redis = get_redis()
+        await redis.zremrangebyscore(settings.SESSION_DENYLIST_KEY, "-inf", now)
+        entries = await redis.zrangebyscore(
+            settings.SESSION_DENYLIST_KEY, now, "+inf", withscores=True)
+    except RedisError as e:
+        logger.warning(f"Session denylist refresh failed: {str(e)}")
+        return
+    for member, until in entries:
+        _denied[int(member)] = max(until, _denied.get(int(member), 0.0))
+    _prune(now)
+
+
+async def deny_sessions(entries: Iterable[Tuple[int, datetime]]) -> None:
+    """Revoke sessions until their access tokens expire"""
+    mapping = {session_id: to_epoch(expires_at) for session_id, expires_at in entries}
+    now = _now()
+    mapping = {k: v for k, v in mapping.items() if v > now}
+    if not mapping:
+        return
+    _denied.update(mapping)
+    if not settings.SESSION_CACHE_REDIS_ENABLED:
+        return
+    try:
+        await get_redis().zadd(settings.SESSION_DENYLIST_KEY, mapping)
+    except RedisError as e:
+        logger.warning(f"Session denylist write failed: {str(e)}")
+
+
+async def is_session_denied(session_id: int) -> bool:
+    await _refresh()
+    until = _denied.get(session_id)
+    if until is None:
+        return False
+    if until <= _now():
+        del _denied[session_id]
+        return False
+    return True
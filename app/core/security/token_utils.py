@@ -1,3 +1,5 @@
+import calendar
+import hashlib
 from datetime import timedelta
 from typing import Optional, List
 from fastapi import HTTPException, status
@@ -46,6 +48,11 @@ def create_refresh_token(data: dict) -> str:
                       algorithm=settings.ALGORITHM)
 
 
+def hash_token(token: str) -> str:
+    """SHA-256 hex digest used to store and look up tokens"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token"""
     try:
@@ -55,6 +62,12 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
+def is_token_expired(payload: dict) -> bool:
+    """Check the exp claim against settings.datetime_now, the clock it was issued with"""
+    now = calendar.timegm(settings.datetime_now.timetuple())
+    return payload.get("exp", 0) <= now
+
+
 def verify_token_and_permissions(
     token: str,
     required_roles: Optional[List[str]] = None,
@@ -4,6 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api import api_router
 from app.core.config import get_settings
 from app.core.logging.logging_config import setup_logging
+from app.core.redis import close_redis
+from app.services.ai import get_ai_client, close_ai_client
+from app.services.face_gallery_sync import start_gallery_sync, stop_gallery_sync
+from app.services.event_queue import start_event_writer, stop_event_writer
 
 settings = get_settings()
 logger = setup_logging()
@@ -12,8 +16,15 @@ logger = setup_logging()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
+    get_ai_client()
+    start_gallery_sync()
+    start_event_writer()
     logger.info("Application startup complete")
     yield
+    await stop_event_writer()
+    await stop_gallery_sync()
+    await close_ai_client()
+    await close_redis()
     logger.info("Application shutdown")
 
 app = FastAPI(
@@ -1,9 +1,11 @@
 from .area import Area
+from .attendance_daily import AttendanceDaily
 from .camera import Camera
 from .department import Department
 from .function import Function
 from .person import Person
 from .person_event import PersonEvent
+from .person_event_id import PersonEventId
 from .person_type import PersonType
 from .privilege import Privilege
 from .role import Role
@@ -19,11 +21,13 @@ from .associations import (
 
 __all__ = [
     "Area",
+    "AttendanceDaily",
     "Camera",
     "Department",
     "Function",
     "Person",
     "PersonEvent",
+    "PersonEventId",
     "PersonType",
     "Privilege",
     "Role",
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.models.base import TimestampModel
+
+
+class AttendanceDaily(TimestampModel):
+    """First-in/last-out per person per day, aggregated from person_event"""
+    __tablename__ = "attendance_daily"
+
+    person_id = Column(String(36), ForeignKey(
+        'person.id', ondelete='CASCADE'), primary_key=True)
+    date = Column(Date, primary_key=True)
+    first_access = Column(DateTime, nullable=False)
+    last_access = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    first_device_id = Column(Integer, ForeignKey(
+        'camera.id', ondelete='SET NULL'))
+    last_device_id = Column(Integer, ForeignKey(
+        'camera.id', ondelete='SET NULL'))
+
+    # Relationships
+    person = relationship("Person")
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_attendance_daily_date', 'date'),
+    )
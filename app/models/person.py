@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime, ARRAY, Float
+from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from app.models.base import TimestampModel
+from app.models.types import Float32Vector
 import uuid
 
 
@@ -14,7 +15,7 @@ class Person(TimestampModel):
     name = Column(String(100), nullable=False)
     code = Column(String(50), nullable=False)
     image = Column(String(100), nullable=False)
-    feature = Column(ARRAY(Float, dimensions=1), nullable=False)  # vector(512)
+    feature = Column(Float32Vector, nullable=False)  # float32[512]
     type = Column(Integer, ForeignKey('person_type.id'), nullable=False)
     # Updated to proper FK
     gender = Column(Boolean)
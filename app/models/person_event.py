@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, ARRAY, Float, Text, Index
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Float, Text, Index
 from sqlalchemy.orm import relationship
 from app.models.base import TimestampModel
+from app.models.types import Float32Vector
 
 
 class PersonEvent(TimestampModel):
@@ -9,12 +10,13 @@ class PersonEvent(TimestampModel):
     event_id = Column(String(36), primary_key=True)
     person_id = Column(String(36), ForeignKey(
         'person.id', ondelete='CASCADE'), nullable=True)
-    access_time = Column(DateTime, nullable=False)
+    # Part of the key because person_event is range-partitioned by month on it
+    access_time = Column(DateTime, primary_key=True, nullable=False)
     device_id = Column(Integer, ForeignKey(
         'camera.id', ondelete='SET NULL'), nullable=False)
     image = Column(Text, nullable=False)
     video = Column(Text)
-    feature = Column(ARRAY(Float, dimensions=1))  # vector(512)
+    feature = Column(Float32Vector)  # float32[512]
     age = Column(Integer)
     gender = Column(Boolean)
     score = Column(Float)
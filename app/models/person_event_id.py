@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, DateTime, Index
+from app.core.database import Base
+
+
+class PersonEventId(Base):
+    """One row per event_id ever written to person_event
+
+    person_event is partitioned by access_time, so its primary key can only
+    make (event_id, access_time) unique. This unpartitioned ledger keeps
+    event_id unique on its own; every insert path claims the id here first.
+    """
+    __tablename__ = "person_event_id"
+
+    event_id = Column(String(36), primary_key=True)
+    access_time = Column(DateTime, nullable=False)
+
+    # Indexes
+    __table_args__ = (
+        Index('ix_person_event_id_access_time', 'access_time'),
+    )
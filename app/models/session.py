@@ -9,8 +9,9 @@ class Session(TimestampModel):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey(
         'user.id', ondelete='CASCADE'), nullable=False)
-    access_token = Column(String, nullable=False)
-    refresh_token = Column(String, nullable=False)
+    # SHA-256 hex digests of the issued tokens; the tokens themselves are not stored
+    access_token_hash = Column(String(64), unique=True, index=True)
+    refresh_token_hash = Column(String(64), unique=True, index=True)
     expires_at = Column(DateTime, nullable=False)
     refresh_expires_at = Column(DateTime, nullable=False)
 
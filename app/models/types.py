@@ -0,0 +1,27 @@
+from typing import Optional
+import numpy as np
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+# Little-endian float32, independent of the host byte order
+FLOAT32_LE = np.dtype("<f4")
+
+
+class Float32Vector(TypeDecorator):
+    """Embedding stored as a bytea of little-endian float32 values
+
+    Half the size of a float8 ARRAY, and decoded straight into a NumPy
+    array with np.frombuffer instead of one Python float per element.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return np.asarray(value, dtype=FLOAT32_LE).tobytes()
+
+    def process_result_value(self, value, dialect) -> Optional[np.ndarray]:
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=FLOAT32_LE)
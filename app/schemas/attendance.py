@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+
+class AttendanceDaily(BaseModel):
+    person_id: str
+    date: date
+    first_access: datetime
+    last_access: datetime
+    count: int
+    first_device_id: Optional[int] = None
+    last_device_id: Optional[int] = None
+    person_code: Optional[str] = None
+    person_name: Optional[str] = None
+    department_id: Optional[int] = None
+
+    model_config = {
+        "from_attributes": True
+    }
@@ -31,6 +31,7 @@ class TokenData(BaseModel):
     sub: str
     username: Optional[str] = None
     client_id: Optional[str] = None
+    session_id: Optional[int] = None
 
 
 class LogoutResponse(BaseModel):
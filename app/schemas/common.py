@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Optional
 from pydantic import BaseModel
 
 T = TypeVar('T')
@@ -6,9 +6,11 @@ T = TypeVar('T')
 
 class PaginationResponse(BaseModel, Generic[T]):
     items: List[T]
-    totalRecords: int
+    totalRecords: Optional[int] = None  # None when the caller skipped counting
+    totalEstimated: bool = False
     currentPage: int
     pageSize: int
+    nextCursor: Optional[str] = None
 
     model_config = {
         "from_attributes": True,
@@ -16,8 +18,10 @@ class PaginationResponse(BaseModel, Generic[T]):
             "example": {
                 "items": [],
                 "totalRecords": 0,
+                "totalEstimated": False,
                 "currentPage": 1,
-                "pageSize": 10
+                "pageSize": 10,
+                "nextCursor": None
             }
         }
     }
@@ -54,6 +54,21 @@ class Person(PersonBase):
     }
 
 
+class PersonImportResult(BaseModel):
+    row: int  # 1-based position in the import
+    code: Optional[str] = None
+    id: Optional[str] = None
+    status: str  # "created" or "failed"
+    error: Optional[str] = None
+
+
+class PersonImportResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: list[PersonImportResult]
+
+
 class FaceSearchRequest(BaseModel):
     base64_image: str
     unit_id: int
@@ -63,6 +78,15 @@ class FaceSearchRequest(BaseModel):
     num_result: Optional[int] = 1
 
 
+class FaceSearchBatchRequest(BaseModel):
+    base64_images: list[str] = Field(..., min_length=1, max_length=64)
+    unit_id: int
+    department_id: Optional[int] = None
+    threshold: Optional[float] = 0.6
+    quality: Optional[float] = 0.3
+    num_result: Optional[int] = 1
+
+
 class FaceDetectResult(BaseModel):
     feature: Optional[list[float]] = None
     face_rectangle: Optional[list[int]] = None
@@ -101,3 +125,12 @@ class FaceSearchResponse(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+
+class FaceSearchBatchItem(FaceSearchResponse):
+    error: Optional[str] = None
+
+
+class FaceSearchBatchResponse(BaseModel):
+    request_time: float = 0
+    items: list[FaceSearchBatchItem] = []
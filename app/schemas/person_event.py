@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -16,9 +16,25 @@ class PersonEventBase(BaseModel):
     quality: Optional[float] = None
 
 
+# Bounds of the person_event columns, checked before anything reaches the database
+INT32_MAX = 2**31 - 1
+
+
 class PersonEventCreate(PersonEventBase):
+    event_id: Optional[str] = Field(..., min_length=1, max_length=36)
+    person_id: Optional[str] = Field(..., max_length=36)
+    device_id: int = Field(..., ge=1, le=INT32_MAX)
+    age: Optional[int] = Field(None, ge=0, le=INT32_MAX)
     feature: Optional[list[float]] = None
 
+    @field_validator("access_time")
+    @classmethod
+    def access_time_is_naive(cls, value: datetime) -> datetime:
+        # Stored as timestamp without time zone in local time (GMT_TIMEZONE)
+        if value.tzinfo is not None:
+            raise ValueError("must be a local time without a UTC offset")
+        return value
+
 
 class PersonEvent(PersonEventBase):
     event_id: str
@@ -26,6 +42,37 @@ class PersonEvent(PersonEventBase):
     created_at: datetime
     status: bool
 
+    @field_validator("feature", mode="before")
+    @classmethod
+    def feature_to_list(cls, value):
+        # Stored features are decoded as NumPy float32 arrays
+        return value.tolist() if hasattr(value, "tolist") else value
+
     model_config = {
         "from_attributes": True
     }
+
+
+class PersonEventBulkResult(BaseModel):
+    index: int  # 0-based position in the request
+    event_id: Optional[str] = None
+    status: str  # "created", "duplicate" or "failed"
+    error: Optional[str] = None
+
+
+class PersonEventBulkResponse(BaseModel):
+    total: int
+    created: int
+    duplicate: int
+    failed: int
+    results: List[PersonEventBulkResult]
+
+
+class PersonEventQueued(BaseModel):
+    event_id: str
+    status: str = "queued"
+
+
+class PersonEventDeadLetter(BaseModel):
+    event: dict
+    error: Optional[str] = None
@@ -5,8 +5,8 @@ from datetime import datetime
 
 class SessionBase(BaseModel):
     user_id: int
-    access_token: str
-    refresh_token: str
+    access_token_hash: Optional[str] = None
+    refresh_token_hash: Optional[str] = None
     expires_at: datetime
     refresh_expires_at: datetime
 
@@ -1,18 +1,246 @@
+import asyncio
+from typing import List, Optional, Set, Tuple, Union
 from fastapi import HTTPException, status
 import httpx
 from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
 from app.schemas.person import FaceDetectResponse
 
 settings = get_settings()
+logger = setup_logging()
 
+# Shared connection pool to the AI service, opened in the app lifespan
+_client: Optional[httpx.AsyncClient] = None
 
-async def detect_face(base64_image: str, timeout: float = 10.0) -> FaceDetectResponse:
+
+def create_ai_client() -> httpx.AsyncClient:
+    """Create a pooled keep-alive client for the AI service"""
+    limits = httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+    )
+    options = dict(
+        base_url=settings.AI_SERVICE_BASE_URL,
+        limits=limits,
+        timeout=settings.AI_HTTP_TIMEOUT,
+    )
+    if settings.AI_HTTP2_ENABLED:
+        try:
+            return httpx.AsyncClient(http2=True, **options)
+        except ImportError:
+            logger.warning(
+                "AI_HTTP2_ENABLED is set but the 'h2' package is missing, using HTTP/1.1")
+    return httpx.AsyncClient(**options)
+
+
+def get_ai_client() -> httpx.AsyncClient:
+    """Get the shared AI service client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_ai_client()
+    return _client
+
+
+async def close_ai_client() -> None:
+    """Close the shared AI service client and its connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _parse_detect_response(response_data: dict) -> FaceDetectResponse:
+    """Validate one detection payload from the AI service"""
+    # Check if response indicates no face detected
+    if response_data.get("data") is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No face detected in image"
+        )
+
+    detect_result = FaceDetectResponse(**response_data)
+
+    # Validate if face is detected
+    if not detect_result.data.feature:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No face detected"
+        )
+
+    return detect_result
+
+
+async def _detect_face_single(base64_image: str, timeout: Optional[float]) -> FaceDetectResponse:
+    client = get_ai_client()
+    try:
+        response = await client.post(
+            settings.DETECT_FACE_URI,
+            json={"base64_image": base64_image},
+            timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout
+        )
+        response.raise_for_status()
+        return _parse_detect_response(response.json())
+
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Face detection service error: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid response from face detection service: {str(e)}"
+        )
+
+
+async def detect_faces_batch(base64_images: List[str]) -> List[Union[FaceDetectResponse, HTTPException]]:
+    """
+    Send several images to the AI batch endpoint in one request
+
+    The batch endpoint takes {"base64_images": [...]} and answers with
+    {"status_code", "message", "data": [...]} where data holds one detection
+    result (or null when no face was found) per image, in request order.
+
+    Returns:
+        One FaceDetectResponse or HTTPException per image
+
+    Raises:
+        HTTPException: If the batch request itself fails
+    """
+    client = get_ai_client()
+    try:
+        response = await client.post(
+            settings.DETECT_FACE_BATCH_URI,
+            json={"base64_images": base64_images}
+        )
+        response.raise_for_status()
+        response_data = response.json()
+        items = response_data.get("data") or []
+        if len(items) != len(base64_images):
+            raise ValueError(
+                f"expected {len(base64_images)} results, got {len(items)}")
+
+        results = []
+        for item in items:
+            try:
+                results.append(_parse_detect_response({
+                    "status_code": response_data.get("status_code", 200),
+                    "message": response_data.get("message", ""),
+                    "data": item
+                }))
+            except (HTTPException, ValueError) as e:
+                results.append(e if isinstance(e, HTTPException) else HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid response from face detection service: {str(e)}"
+                ))
+        return results
+
+    except httpx.HTTPError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Face detection service error: {str(e)}"
+        )
+    except ValueError as e:
+        # Same status as the single-image path
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid response from face detection service: {str(e)}"
+        )
+
+
+def _batch_error(error: Exception) -> HTTPException:
+    """New HTTPException equivalent to a failed batch request"""
+    if isinstance(error, HTTPException):
+        return HTTPException(
+            status_code=error.status_code,
+            detail=error.detail,
+            headers=error.headers
+        )
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Face detection service error: {str(error)}"
+    )
+
+
+class DetectFaceBatcher:
+    """Collect concurrent detect_face calls into batched AI requests
+
+    The first queued image opens a window of DETECT_FACE_BATCH_MAX_WAIT_MS;
+    the batch is sent when the window closes or DETECT_FACE_BATCH_MAX_SIZE
+    images are waiting, and each caller gets its own result back.
+    """
+
+    def __init__(self, max_size: int, max_wait_ms: float):
+        self.max_size = max(1, max_size)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, base64_image: str) -> FaceDetectResponse:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((base64_image, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await detect_faces_batch([image for image, _ in batch])
+        except Exception as e:
+            # A fresh exception per waiter; a shared instance would have its
+            # traceback rewritten by every task that raises it
+            results = [_batch_error(e) for _ in batch]
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_batcher: Optional[DetectFaceBatcher] = None
+
+
+def get_detect_face_batcher() -> DetectFaceBatcher:
+    global _batcher
+    if _batcher is None:
+        _batcher = DetectFaceBatcher(
+            settings.DETECT_FACE_BATCH_MAX_SIZE,
+            settings.DETECT_FACE_BATCH_MAX_WAIT_MS
+        )
+    return _batcher
+
+
+async def detect_face(base64_image: str, timeout: Optional[float] = None) -> FaceDetectResponse:
     """
     Call AI service to detect face and get embedding
 
+    When DETECT_FACE_BATCH_URI is set, concurrent calls are micro-batched
+    into a single request to the batch endpoint.
+
     Args:
         base64_image: Base64 encoded image
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds, defaults to AI_HTTP_TIMEOUT
 
     Returns:
         FaceDetectResponse object containing detection results
@@ -20,41 +248,45 @@ async def detect_face(base64_image: str, timeout: float = 10.0) -> FaceDetectRes
     Raises:
         HTTPException: If face detection fails or no face detected
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{settings.AI_SERVICE_BASE_URL}{settings.DETECT_FACE_URI}",
-                json={"base64_image": base64_image},
-                timeout=timeout
-            )
-            response.raise_for_status()
-            response_data = response.json()
-
-            # Check if response indicates no face detected
-            if response_data.get("data") is None:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No face detected in image"
-                )
+    if not settings.DETECT_FACE_BATCH_URI:
+        return await _detect_face_single(base64_image, timeout)
 
-            detect_result = FaceDetectResponse(**response_data)
+    batcher = get_detect_face_batcher()
+    try:
+        return await asyncio.wait_for(
+            batcher.submit(base64_image),
+            (timeout or settings.AI_HTTP_TIMEOUT) + batcher.max_wait
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Face detection service error: request timed out"
+        )
 
-            # Validate if face is detected
-            if not detect_result.data.feature:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No face detected"
-                )
-
-            return detect_result
-
-        except httpx.HTTPError as e:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Face detection service error: {str(e)}"
-            )
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid response from face detection service: {str(e)}"
-            )
+
+async def detect_faces(base64_images: List[str]) -> List[Union[FaceDetectResponse, HTTPException]]:
+    """
+    Detect faces in several images at once
+
+    Uses the batch endpoint when DETECT_FACE_BATCH_URI is set, otherwise runs
+    single detections concurrently over the shared connection pool.
+
+    Returns:
+        One FaceDetectResponse or HTTPException per image, in order
+    """
+    if settings.DETECT_FACE_BATCH_URI:
+        size = max(1, settings.DETECT_FACE_BATCH_MAX_SIZE)
+        chunks = await asyncio.gather(*[
+            detect_faces_batch(base64_images[start:start + size])
+            for start in range(0, len(base64_images), size)
+        ])
+        return [result for chunk in chunks for result in chunk]
+
+    results = await asyncio.gather(
+        *[_detect_face_single(image, None) for image in base64_images],
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, HTTPException):
+            raise result
+    return list(results)
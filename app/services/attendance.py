@@ -0,0 +1,187 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import get_settings
+from app.models import AttendanceDaily, Person
+from app.schemas.attendance import AttendanceDaily as AttendanceDailySchema
+from app.schemas.common import PaginationResponse
+from app.services.department_tree import get_unit_department_ids
+from .base import BasePaginationService
+
+settings = get_settings()
+
+attendance_pagination = BasePaginationService[AttendanceDaily, AttendanceDailySchema](
+    model=AttendanceDaily,
+    schema=AttendanceDailySchema
+)
+
+# Recompute days from person_event; soft-deleted events drop out. Overlapping
+# rebuilds of the same day (beat task and an event delete) both succeed
+ROLLUP = text("""
+    INSERT INTO attendance_daily (person_id, date, first_access, last_access, count,
+                                  first_device_id, last_device_id, created_at)
+    SELECT person_id, access_time::date, min(access_time), max(access_time), count(*),
+           (array_agg(device_id ORDER BY access_time))[1],
+           (array_agg(device_id ORDER BY access_time DESC))[1], :now
+    FROM person_event
+    WHERE person_id IS NOT NULL AND deleted_at IS NULL
+      AND access_time >= :start AND access_time < :end
+      AND (CAST(:person_id AS varchar) IS NULL OR person_id = :person_id)
+    GROUP BY person_id, access_time::date
+    ON CONFLICT (person_id, date) DO UPDATE SET
+        first_access = excluded.first_access,
+        last_access = excluded.last_access,
+        count = excluded.count,
+        first_device_id = excluded.first_device_id,
+        last_device_id = excluded.last_device_id,
+        updated_at = excluded.created_at
+""")
+CLEAR = text("""
+    DELETE FROM attendance_daily
+    WHERE date >= :start AND date < :end
+      AND (CAST(:person_id AS varchar) IS NULL OR person_id = :person_id)
+""")
+
+
+def _summaries(events: Iterable[dict]) -> List[dict]:
+    """Fold events into one attendance row per (person_id, date)"""
+    days: Dict[tuple, dict] = {}
+    for event in events:
+        if not event.get("person_id"):
+            continue
+        access_time, device_id = event["access_time"], event["device_id"]
+        key = (event["person_id"], access_time.date())
+        day = days.get(key)
+        if day is None:
+            days[key] = {
+                "person_id": key[0], "date": key[1], "count": 1,
+                "first_access": access_time, "first_device_id": device_id,
+                "last_access": access_time, "last_device_id": device_id,
+            }
+            continue
+        day["count"] += 1
+        if access_time < day["first_access"]:
+            day["first_access"], day["first_device_id"] = access_time, device_id
+        if access_time > day["last_access"]:
+            day["last_access"], day["last_device_id"] = access_time, device_id
+    # A fixed order keeps concurrent upserts from deadlocking on row locks
+    return [days[key] for key in sorted(days)]
+
+
+async def record_attendance(db: AsyncSession, events: Iterable[dict]) -> None:
+    """Fold newly inserted events into attendance_daily
+
+    Runs in the caller's transaction so the summary commits with the events.
+    Events without a person are ignored.
+    """
+    rows = _summaries(events)
+    if not rows:
+        return
+    now = settings.datetime_now
+    statement = pg_insert(AttendanceDaily).values(
+        [{**row, "created_at": now} for row in rows])
+    excluded, current = statement.excluded, AttendanceDaily
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[AttendanceDaily.person_id, AttendanceDaily.date],
+        set_={
+            "count": current.count + excluded.count,
+            "first_access": func.least(current.first_access, excluded.first_access),
+            "first_device_id": case(
+                (excluded.first_access < current.first_access, excluded.first_device_id),
+                else_=current.first_device_id),
+            "last_access": func.greatest(current.last_access, excluded.last_access),
+            "last_device_id": case(
+                (excluded.last_access > current.last_access, excluded.last_device_id),
+                else_=current.last_device_id),
+            "updated_at": now,
+        }
+    ))
+
+
+async def rollup_attendance(
+    db: AsyncSession,
+    start_date: date,
+    end_date: date,
+    person_id: Optional[str] = None,
+    commit: bool = True
+) -> int:
+    """Rebuild attendance for days in [start_date, end_date), return rows written
+
+    Corrects the incremental summary for soft-deleted or late events. With
+    `commit=False` the rebuild joins the caller's transaction.
+    """
+    params = {
+        "start": start_date,
+        "end": end_date,
+        "person_id": person_id,
+    }
+    await db.execute(CLEAR, params)
+    result = await db.execute(ROLLUP, {
+        **params,
+        "start": datetime.combine(start_date, datetime.min.time()),
+        "end": datetime.combine(end_date, datetime.min.time()),
+        "now": settings.datetime_now,
+    })
+    if commit:
+        await db.commit()
+    return result.rowcount
+
+
+async def rollup_recent_attendance(db: AsyncSession) -> int:
+    """Rebuild the last ATTENDANCE_ROLLUP_DAYS days, today included"""
+    today = settings.datetime_now.date()
+    start = today - timedelta(days=max(1, settings.ATTENDANCE_ROLLUP_DAYS) - 1)
+    return await rollup_attendance(db, start, today + timedelta(days=1))
+
+
+async def get_attendance(
+    db: AsyncSession,
+    *,
+    page: int = 1,
+    page_size: int = 100,
+    after: Optional[str] = None,
+    with_total: bool = True,
+    unit_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    person_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> PaginationResponse[AttendanceDailySchema]:
+    """Get paginated daily attendance, newest day first"""
+    query = (
+        select(AttendanceDaily)
+        .join(Person, AttendanceDaily.person_id == Person.id)
+        .options(selectinload(AttendanceDaily.person))
+    )
+
+    conditions = []
+    if department_id is not None:
+        conditions.append(Person.department_id == department_id)
+    if unit_id is not None:
+        department_ids = await get_unit_department_ids(db, unit_id)
+        conditions.append(Person.department_id.in_(department_ids))
+    if person_id:
+        conditions.append(AttendanceDaily.person_id == person_id)
+    if start_date:
+        conditions.append(AttendanceDaily.date >= start_date)
+    if end_date:
+        conditions.append(AttendanceDaily.date <= end_date)
+    query = query.where(*conditions)
+
+    return await attendance_pagination.get_paginated(
+        db,
+        page=page,
+        size=page_size,
+        query=query,
+        cursor_columns=[AttendanceDaily.date, AttendanceDaily.person_id],
+        after=after,
+        with_total=with_total,
+        extras=lambda row: {
+            "person_code": row.person.code,
+            "person_name": row.person.name,
+            "department_id": row.person.department_id,
+        }
+    )
@@ -3,9 +3,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app.core.config import get_settings
 from app.core.security import create_access_token, create_refresh_token
+from app.core.security.token_utils import hash_token
 from app.services.user import get_user_by_username
-from app.services.session import create_session
-from app.schemas import SessionCreate
+from app.services.session import open_session
 from app.schemas.auth import (
     TokenResponse,
     TokenData,
@@ -48,24 +48,24 @@ async def create_token_response(db: AsyncSession, user: User, client_id: str) ->
         days=settings.REFRESH_TOKEN_EXPIRE_DAYS
     )
 
+    session = await open_session(
+        db, user.id, access_token_expires, refresh_token_expires)
+
     token_data = TokenData(
         sub=str(user.id),
         username=user.username,
-        client_id=client_id
+        client_id=client_id,
+        session_id=session.id
     )
 
     access_token = create_access_token(data=token_data.model_dump())
     refresh_token = create_refresh_token(
-        data={"sub": token_data.sub, "client_id": client_id}
-    )
-    session_data = SessionCreate(
-        user_id=user.id,
-        access_token=access_token,
-        refresh_token=refresh_token,
-        expires_at=access_token_expires,
-        refresh_expires_at=refresh_token_expires
+        data={"sub": token_data.sub, "client_id": client_id,
+              "session_id": session.id}
     )
-    await create_session(db, session_data)
+    session.access_token_hash = hash_token(access_token)
+    session.refresh_token_hash = hash_token(refresh_token)
+    await db.commit()
     return TokenResponse(
         accessToken=access_token,
         accessTokenExpires=access_token_expires,
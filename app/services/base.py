@@ -1,14 +1,102 @@
-from sqlalchemy.orm import class_mapper, selectinload
-from typing import TypeVar, Generic, List, Optional, Any, Type, Dict
-from sqlalchemy import select, func
+import base64
+import binascii
+import json
+import time
+from datetime import date, datetime
+from operator import attrgetter
+from sqlalchemy.orm import class_mapper, selectinload, load_only
+from typing import TypeVar, Generic, List, Optional, Any, Type, Dict, Sequence, Tuple, Collection, Callable
+from fastapi import HTTPException, status
+from sqlalchemy import select, func, tuple_, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select
 from app.schemas.common import PaginationResponse
 from app.models.base import TimestampModel
+from app.core.config import get_settings
+
+settings = get_settings()
 
 ModelType = TypeVar("ModelType", bound=TimestampModel)
 SchemaType = TypeVar("SchemaType")
 
+# count statement + params -> (expires at in monotonic seconds, total)
+_count_cache: Dict[str, Tuple[float, int]] = {}
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row into an opaque cursor"""
+    # datetime is a date subclass, so this covers both
+    payload = [v.isoformat() if isinstance(v, date) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _parse_cursor_value(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into sort key values typed like `columns`"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor length mismatch")
+        return [
+            _parse_cursor_value(value, column.type.python_type)
+            for value, column in zip(values, columns)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def estimate_table_rows(db: AsyncSession, table_name: str) -> Optional[int]:
+    """Planner row estimate for a table, None if it was never analyzed
+
+    A partitioned parent has no rows of its own (reltuples is -1), so its
+    estimate is the sum over the analyzed partitions.
+    """
+    estimate = await db.scalar(
+        text(
+            "SELECT CASE WHEN c.relkind = 'p' THEN ("
+            "  SELECT sum(p.reltuples) FILTER (WHERE p.reltuples >= 0)"
+            "  FROM pg_inherits i JOIN pg_class p ON p.oid = i.inhrelid"
+            "  WHERE i.inhparent = c.oid"
+            ") ELSE c.reltuples END::bigint "
+            "FROM pg_class c WHERE c.oid = to_regclass(:name)"
+        ),
+        {"name": table_name}
+    )
+    return estimate if estimate is not None and estimate >= 0 else None
+
+
+async def count_rows(db: AsyncSession, query: Select) -> int:
+    """Exact count of a filtered query, cached for PAGINATION_COUNT_CACHE_TTL seconds"""
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    compiled = count_query.compile()
+    key = f"{compiled}|{sorted(compiled.params.items(), key=lambda p: p[0])!r}"
+
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    total = await db.scalar(count_query)
+    if settings.PAGINATION_COUNT_CACHE_TTL > 0:
+        if len(_count_cache) >= settings.PAGINATION_COUNT_CACHE_SIZE:
+            _count_cache.clear()
+        _count_cache[key] = (now + settings.PAGINATION_COUNT_CACHE_TTL, total)
+    return total
+
 
 class BasePaginationService(Generic[ModelType, SchemaType]):
     """Base class for pagination services"""
@@ -17,20 +105,40 @@ class BasePaginationService(Generic[ModelType, SchemaType]):
         self.model = model
         self.schema = schema
 
+        # Column accessors are resolved once per model instead of once per row
+        mapper = class_mapper(model)
+        self._column_keys = tuple(attr.key for attr in mapper.column_attrs)
+        self._column_getter = attrgetter(*self._column_keys)
+        self._has_functions = "functions" in mapper.relationships
+        # Columns always loaded under projection: keys used by eager loads
+        self._required_keys = {
+            attr.key for attr in mapper.column_attrs
+            if any(column.primary_key or column.foreign_keys for column in attr.columns)
+        }
+
     def _get_relationships(self) -> List[str]:
-        """Get all relationship names for the model"""
-        mapper = class_mapper(self.model)
-        return [rel.key for rel in mapper.relationships]
+        """Get the relationships read by _model_to_dict
 
-    def _model_to_dict(self, obj: Any) -> Dict:
-        """Convert SQLAlchemy model to dictionary"""
-        data = {}
-        # Get columns
-        for column in class_mapper(obj.__class__).columns.keys():
-            data[column] = getattr(obj, column)
+        Only these are eager loaded; loading the rest (e.g. every event of
+        each camera) cost extra queries whose results were never used.
+        Items are validated from _model_to_dict, which reads columns and
+        `functions` only; callers whose `extras` read other relationships
+        eager load them in their own query.
+        """
+        return ["functions"] if self._has_functions else []
+
+    def _model_to_dict(self, obj: Any, fields: Optional[Collection[str]] = None) -> Dict:
+        """Convert SQLAlchemy model to dictionary, optionally limited to `fields`"""
+        if fields is not None:
+            data = {key: getattr(obj, key) for key in fields if key in self._column_keys}
+        else:
+            values = self._column_getter(obj)
+            if len(self._column_keys) == 1:
+                values = (values,)
+            data = dict(zip(self._column_keys, values))
 
         # Handle functions relationship specially for Camera model
-        if hasattr(obj, 'functions'):
+        if self._has_functions and (fields is None or 'functions' in fields):
             data['functions'] = [
                 {"id": f.id, "name": f.name}
                 for f in obj.functions
@@ -46,10 +154,32 @@ class BasePaginationService(Generic[ModelType, SchemaType]):
         page: int = 1,
         size: int = 10,
         query: Optional[Select] = None,
+        cursor_columns: Optional[Sequence[Any]] = None,
+        descending: bool = True,
+        after: Optional[str] = None,
+        with_total: bool = True,
+        estimate_total: bool = False,
+        fields: Optional[Collection[str]] = None,
+        extras: Optional[Callable[[Any], Dict]] = None,
         **filters: Any
     ) -> PaginationResponse[SchemaType]:
         """
         Get paginated results with optional filters
+
+        With `cursor_columns` (a unique sort key, e.g. time then primary key) the
+        response carries a `nextCursor`; passing it back as `after` seeks past the
+        last row instead of using OFFSET, so deep pages cost the same as the first.
+
+        The total is counted over the filtered query. `with_total=False` skips it,
+        and `estimate_total=True` (for unfiltered listings) returns the planner's
+        pg_class.reltuples estimate once the table exceeds
+        PAGINATION_ESTIMATE_MIN_ROWS.
+
+        `fields` projects each item to the named schema fields: only those columns
+        are loaded and items are returned as plain dicts without re-validation.
+
+        `extras(row)` adds computed fields to each item from relationships the
+        caller eager loaded in `query`.
         """
         # Normalize pagination params
         page = max(1, page)
@@ -60,11 +190,6 @@ class BasePaginationService(Generic[ModelType, SchemaType]):
         if query is None:
             query = select(self.model)
 
-        # Add eager loading for all relationships
-        for relationship in self._get_relationships():
-            query = query.options(selectinload(
-                getattr(self.model, relationship)))
-
         # Add default filter for non-deleted items
         query = query.where(self.model.deleted_at.is_(None))
 
@@ -74,26 +199,103 @@ class BasePaginationService(Generic[ModelType, SchemaType]):
                 query = query.where(getattr(self.model, field) == value)
 
         # Get total count
-        count_query = select(func.count()).select_from(
-            select(self.model).where(self.model.deleted_at.is_(None))
-        )
-        total = await db.scalar(count_query)
+        total = None
+        total_estimated = False
+        if with_total:
+            if estimate_total:
+                estimate = await estimate_table_rows(db, self.model.__tablename__)
+                if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_MIN_ROWS:
+                    total, total_estimated = estimate, True
+            if total is None:
+                total = await count_rows(db, query)
+
+        if fields is not None:
+            fields = self._check_fields(fields)
+            loaded = (set(fields) | self._required_keys) & set(self._column_keys)
+            loaded |= {column.key for column in cursor_columns or ()}
+            query = query.options(load_only(
+                *[getattr(self.model, key) for key in loaded]))
+
+        # Add eager loading for all relationships
+        for relationship in self._get_relationships():
+            query = query.options(selectinload(
+                getattr(self.model, relationship)))
 
         # Get paginated data
-        query = query.offset(offset).limit(size)
-        result = await db.execute(query)
-        items = result.unique().scalars().all()
+        next_cursor = None
+        if cursor_columns:
+            query = query.order_by(*[
+                column.desc() if descending else column.asc()
+                for column in cursor_columns
+            ])
+            if after:
+                decoded = decode_cursor(after, cursor_columns)
+                key = tuple_(*cursor_columns)
+                values = tuple_(*decoded)
+                query = query.where(key < values if descending else key > values)
+                # Redundant bound on the leading column; the planner can prune
+                # partitions (and use plain indexes) from it, not from the tuple
+                leading = cursor_columns[0]
+                if decoded[0] is not None:
+                    query = query.where(
+                        leading <= decoded[0] if descending else leading >= decoded[0])
+            else:
+                query = query.offset(offset)
+            # Fetch one extra row to know whether another page exists
+            result = await db.execute(query.limit(size + 1))
+            items = result.unique().scalars().all()
+            if len(items) > size:
+                items = items[:size]
+                next_cursor = encode_cursor([
+                    getattr(items[-1], column.key) for column in cursor_columns
+                ])
+        else:
+            query = query.offset(offset).limit(size)
+            result = await db.execute(query)
+            items = result.unique().scalars().all()
 
         # Convert to schema
-        schema_items = [
-            self.schema.model_validate(self._model_to_dict(item)) for item in items
-        ]
+        if fields is not None:
+            schema_items = [self._item_dict(item, extras, fields) for item in items]
+        else:
+            schema_items = [
+                self.schema.model_validate(self._item_dict(item, extras))
+                for item in items
+            ]
 
         # Create response dictionary
         response_data = {
             "totalRecords": total,
+            "totalEstimated": total_estimated,
             "currentPage": page,
             "pageSize": size,
             "items": schema_items,
+            "nextCursor": next_cursor,
         }
+        if fields is not None:
+            return PaginationResponse[Dict[str, Any]].model_construct(**response_data)
         return PaginationResponse[SchemaType](**response_data)
+
+    def _item_dict(
+        self,
+        obj: Any,
+        extras: Optional[Callable[[Any], Dict]] = None,
+        fields: Optional[Collection[str]] = None
+    ) -> Dict:
+        data = self._model_to_dict(obj, fields)
+        if extras:
+            data.update(
+                (key, value) for key, value in extras(obj).items()
+                if fields is None or key in fields
+            )
+        return data
+
+    def _check_fields(self, fields: Collection[str]) -> List[str]:
+        """Validate a projection against the schema's fields"""
+        unknown = set(fields) - set(self.schema.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        return list(dict.fromkeys(fields))
@@ -0,0 +1,73 @@
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def validation_message(error: ValidationError) -> str:
+    """One line per invalid field, e.g. "event_id: String should have at most 36 characters" """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+async def stream_batches(
+    rows: AsyncIterable[Any],
+    batch_size: int,
+    start: int = 0
+) -> AsyncIterator[List[tuple]]:
+    """Group a stream into lists of (position, raw row) pairs of at most `batch_size`"""
+    batch: List[tuple] = []
+    position = start
+    async for raw in rows:
+        batch.append((position, raw))
+        position += 1
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_batch(
+    batch: List[tuple],
+    schema: Type[BaseModel],
+    key: str,
+    fail: Callable[[int, Optional[str], str], None]
+) -> List[tuple]:
+    """Validate (position, raw row) pairs against `schema`
+
+    Rows that are not objects or do not validate are reported through
+    fail(position, row[key], error); the rest come back as (position, model).
+    """
+    valid = []
+    for position, raw in batch:
+        if not isinstance(raw, dict):
+            fail(position, None, "Not a JSON object")
+            continue
+        try:
+            valid.append((position, schema.model_validate(raw)))
+        except ValidationError as e:
+            value = raw.get(key)
+            fail(position, value if isinstance(value, str) else None, validation_message(e))
+    return valid
+
+
+async def existing_values(db: AsyncSession, column, values: Iterable) -> set:
+    """Subset of `values` present in `column` on rows that are not soft-deleted"""
+    values = set(values)
+    if not values:
+        return set()
+    model = column.class_
+    result = await db.execute(
+        select(column).where(column.in_(values), model.deleted_at.is_(None)))
+    return set(result.scalars().all())
+
+
+def count_statuses(results: Iterable[Any], statuses: Iterable[str]) -> Dict[str, int]:
+    """Number of results per status, zero for statuses that never occurred"""
+    counts = {status: 0 for status in statuses}
+    for result in results:
+        counts[result.status] += 1
+    return counts
@@ -32,6 +32,19 @@ async def get_camera_by_id(db: AsyncSession, camera_id: int) -> Optional[Camera]
     return result.scalar_one_or_none()
 
 
+def _camera_extras(camera: Camera) -> dict:
+    """Area and server fields taken from the eager-loaded relationships"""
+    # Soft-deleted areas and servers are hidden alike
+    area = camera.area if camera.area and not camera.area.deleted_at else None
+    server = camera.server if camera.server and not camera.server.deleted_at else None
+    return {
+        "area_code": area.code if area else None,
+        "area_name": area.name if area else None,
+        "unit_id": area.unit_id if area else None,
+        "server_name": server.name if server else None,
+    }
+
+
 async def get_cameras(
     db: AsyncSession,
     *,
@@ -83,35 +96,17 @@ async def get_cameras(
     # Apply all conditions
     query = query.where(*conditions)
 
-    # Get paginated results
-    result = await camera_pagination.get_paginated(
+    # Get paginated results; area, server and functions come from the
+    # selectinloads above, so a page costs the same statements at any size
+    return await camera_pagination.get_paginated(
         db,
         page=page,
         size=size,
         query=query,
+        extras=_camera_extras,
         **filters
     )
 
-    # Enhance response items with additional fields and convert functions
-    for item in result.items:
-        if item.area_id:
-            area: Area = await get_area_by_id(db, item.area_id)
-            item.area_code = area.code
-            item.area_name = area.name
-            # Add unit_id from area
-            if area:
-                item.unit_id = area.unit_id
-        if item.server_id:
-            server: Server = await get_server_by_id(db, item.server_id)
-            item.server_name = server.name
-
-        # Convert functions to the expected format
-        item.functions = [
-            {"id": f.id, "name": f.name} for f in item.functions
-        ]
-
-    return result
-
 
 async def create_camera(db: AsyncSession, camera_data: CameraCreate) -> Camera:
     # Check if area exists
@@ -8,6 +8,7 @@ from app.schemas.common import PaginationResponse
 from fastapi import HTTPException, status
 from app.core.config import get_settings
 from .base import BasePaginationService
+from .department_tree import invalidate_department_tree
 from .unit import get_unit_by_id
 
 settings = get_settings()
@@ -121,6 +122,7 @@ async def create_department(db: AsyncSession, department_data: DepartmentCreate)
     db.add(db_department)
     await db.commit()
     await db.refresh(db_department)
+    invalidate_department_tree()
     return db_department
 
 
@@ -199,6 +201,7 @@ async def update_department(
 
     await db.commit()
     await db.refresh(department)
+    invalidate_department_tree()
     return department
 
 
@@ -209,4 +212,5 @@ async def delete_department(db: AsyncSession, department_id: int) -> bool:
 
     department.deleted_at = settings.datetime_now
     await db.commit()
+    invalidate_department_tree()
     return True
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Department, Unit
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Snapshot of the unit/department hierarchy, shared by all requests in the process
+_snapshot: Optional[dict] = None
+_lock = asyncio.Lock()
+
+
+def invalidate_department_tree() -> None:
+    """Drop the cached hierarchy after a unit or department write"""
+    global _snapshot
+    _snapshot = None
+
+
+def _is_fresh(snapshot: Optional[dict]) -> bool:
+    return snapshot is not None and \
+        time.monotonic() - snapshot["loaded_at"] < settings.DEPARTMENT_CACHE_TTL
+
+
+async def _load(db: AsyncSession) -> dict:
+    departments = await db.execute(
+        select(Department.id, Department.unit_id, Department.parent_id)
+        .where(Department.deleted_at.is_(None))
+    )
+    units = await db.execute(
+        select(Unit.id, Unit.parent_id).where(Unit.deleted_at.is_(None))
+    )
+
+    unit_departments: Dict[int, List[int]] = defaultdict(list)
+    department_children: Dict[int, List[int]] = defaultdict(list)
+    for department_id, unit_id, parent_id in departments.all():
+        unit_departments[unit_id].append(department_id)
+        if parent_id is not None:
+            department_children[parent_id].append(department_id)
+
+    unit_children: Dict[int, List[int]] = defaultdict(list)
+    for unit_id, parent_id in units.all():
+        if parent_id is not None:
+            unit_children[parent_id].append(unit_id)
+
+    return {
+        "loaded_at": time.monotonic(),
+        "unit_departments": unit_departments,
+        "unit_children": unit_children,
+        "department_children": department_children,
+    }
+
+
+async def _get_snapshot(db: AsyncSession) -> dict:
+    global _snapshot
+    if _is_fresh(_snapshot):
+        return _snapshot
+    async with _lock:
+        if not _is_fresh(_snapshot):
+            _snapshot = await _load(db)
+    return _snapshot
+
+
+def _descendants(root: int, children: Dict[int, List[int]]) -> List[int]:
+    """Walk a parent_id tree, guarding against cycles"""
+    seen = {root}
+    stack = [root]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return list(seen)
+
+
+async def get_unit_department_ids(
+    db: AsyncSession,
+    unit_id: int,
+    include_child_units: bool = False
+) -> List[int]:
+    """Get ids of all active departments in a unit, optionally with its child units"""
+    snapshot = await _get_snapshot(db)
+    unit_ids = _descendants(unit_id, snapshot["unit_children"]) \
+        if include_child_units else [unit_id]
+    return [
+        department_id
+        for unit in unit_ids
+        for department_id in snapshot["unit_departments"].get(unit, ())
+    ]
+
+
+async def get_department_subtree_ids(db: AsyncSession, department_id: int) -> List[int]:
+    """Get a department id together with the ids of all its sub-departments"""
+    snapshot = await _get_snapshot(db)
+    return _descendants(department_id, snapshot["department_children"])
@@ -0,0 +1,123 @@
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+
+settings = get_settings()
+logger = setup_logging()
+
+PARENT_TABLE = "person_event"
+DEFAULT_PARTITION = "person_event_default"
+
+# relpartbound renders as FOR VALUES FROM ('2024-01-01 00:00:00') TO ('2024-02-01 00:00:00')
+BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+NAME_PATTERN = re.compile(rf"^{PARENT_TABLE}_y\d{{4}}m\d{{2}}$")
+
+LIST_PARTITIONS = text("""
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :parent
+""")
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    """True once migration 06 turned person_event into a partitioned table"""
+    relkind = await db.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARENT_TABLE}
+    )
+    return relkind == "p"
+
+
+async def list_event_partitions(db: AsyncSession) -> List[Tuple[str, datetime, datetime]]:
+    """Monthly partitions as (name, from, to), oldest first; the default partition is skipped"""
+    result = await db.execute(LIST_PARTITIONS, {"parent": PARENT_TABLE})
+    partitions = []
+    for name, bound in result.all():
+        match = BOUND_PATTERN.search(bound or "")
+        if match:
+            partitions.append((
+                name,
+                datetime.fromisoformat(match.group(1)),
+                datetime.fromisoformat(match.group(2))
+            ))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+async def create_event_partition(db: AsyncSession, month: datetime) -> Optional[str]:
+    """Create the partition holding `month`, None if it already exists
+
+    Rows that landed in the default partition for that month are moved into
+    the new partition before it is attached.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    if await db.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+        return None
+
+    bounds = {"low": month, "high": add_months(month, 1)}
+    in_range = "access_time >= :low AND access_time < :high"
+    has_default = await db.scalar(
+        text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION})
+    stray = has_default and await db.scalar(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds)
+
+    low, high = month.isoformat(sep=" "), bounds["high"].isoformat(sep=" ")
+    if not stray:
+        await db.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{low}') TO ('{high}')"))
+        return name
+
+    await db.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    await db.execute(text(
+        f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    await db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+    await db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{low}') TO ('{high}')"))
+    logger.warning(f"Moved default-partition events into {name}")
+    return name
+
+
+async def ensure_event_partitions(db: AsyncSession, months_ahead: int) -> List[str]:
+    """Create partitions from the current month to `months_ahead` months out"""
+    if not await is_partitioned(db):
+        return []
+    current = month_start(settings.datetime_now)
+    created = []
+    for offset in range(months_ahead + 1):
+        name = await create_event_partition(db, add_months(current, offset))
+        if name:
+            created.append(name)
+    await db.commit()
+    return created
+
+
+async def detach_event_partition(db: AsyncSession, name: str, drop: bool = False) -> None:
+    """Detach a monthly partition, optionally dropping it; instant compared to DELETE"""
+    if not NAME_PATTERN.match(name):
+        raise ValueError(f"Not a monthly event partition: {name}")
+    await db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    if drop:
+        await db.execute(text(f"DROP TABLE {name}"))
+    await db.commit()
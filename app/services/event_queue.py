@@ -0,0 +1,200 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import AsyncIterator, List, Optional
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.logging.logging_config import setup_logging
+from app.core.redis import get_redis
+from app.schemas.person_event import PersonEventCreate, PersonEventBulkResponse
+from app.services.person_event import create_person_events_bulk
+
+settings = get_settings()
+logger = setup_logging()
+
+# In-process queue used when EVENT_WRITE_MODE is "memory"
+_queue: Optional[asyncio.Queue] = None
+_dead_letters: deque = deque(maxlen=10000)
+_drain_task: Optional[asyncio.Task] = None
+# Batch being written by the in-process writer
+_write_task: Optional[asyncio.Future] = None
+
+
+def is_write_behind() -> bool:
+    return settings.EVENT_WRITE_MODE in ("redis", "memory")
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=settings.EVENT_QUEUE_MAX_SIZE)
+    return _queue
+
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Event queue is full, retry later",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def enqueue_event(event: PersonEventCreate) -> str:
+    """Queue a validated event for write-behind and return its event_id
+
+    Raises:
+        HTTPException: 503 with Retry-After when the queue is full
+    """
+    payload = event.model_dump(mode="json")
+    payload["event_id"] = payload.get("event_id") or str(uuid.uuid4())
+
+    if settings.EVENT_WRITE_MODE == "memory":
+        try:
+            _get_queue().put_nowait(payload)
+        except asyncio.QueueFull:
+            raise _queue_full()
+        return payload["event_id"]
+
+    try:
+        redis = get_redis()
+        if await redis.llen(settings.EVENT_QUEUE_KEY) >= settings.EVENT_QUEUE_MAX_SIZE:
+            raise _queue_full()
+        await redis.rpush(settings.EVENT_QUEUE_KEY, json.dumps(payload))
+    except RedisError as e:
+        logger.error(f"Event not queued: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event queue unavailable"
+        )
+    return payload["event_id"]
+
+
+async def _rows(events: List[dict]) -> AsyncIterator[dict]:
+    for event in events:
+        yield event
+
+
+async def _dead_letter(events: List[dict], response: PersonEventBulkResponse) -> None:
+    """Keep rejected events with their error for inspection"""
+    rejects = [
+        {"event": event, "error": result.error}
+        for event, result in zip(events, response.results)
+        if result.status == "failed"
+    ]
+    if not rejects:
+        return
+    logger.warning(f"{len(rejects)} queued events rejected")
+    if settings.EVENT_WRITE_MODE == "memory":
+        _dead_letters.extend(rejects)
+        return
+    redis = get_redis()
+    await redis.rpush(settings.EVENT_DEAD_LETTER_KEY, *[json.dumps(r) for r in rejects])
+    await redis.ltrim(settings.EVENT_DEAD_LETTER_KEY, -settings.EVENT_DEAD_LETTER_MAX_SIZE, -1)
+
+
+async def write_events(db: AsyncSession, events: List[dict]) -> PersonEventBulkResponse:
+    """Insert a drained batch and dead-letter its rejects"""
+    response = await create_person_events_bulk(db, _rows(events))
+    await _dead_letter(events, response)
+    return response
+
+
+async def drain_redis_queue(db: AsyncSession, max_batches: int) -> int:
+    """Move queued events from Redis into person_event, return events drained
+
+    Events the database rejects are dead-lettered one by one, so only
+    errors that hit the whole batch, such as a lost connection, push the
+    popped events back; event_id conflicts make a replay harmless.
+    """
+    redis = get_redis()
+    drained = 0
+    for _ in range(max_batches):
+        raw = await redis.lpop(settings.EVENT_QUEUE_KEY, settings.EVENT_DRAIN_BATCH_SIZE)
+        if not raw:
+            break
+        events = [json.loads(item) for item in raw]
+        try:
+            await write_events(db, events)
+        except Exception:
+            await db.rollback()
+            await redis.lpush(settings.EVENT_QUEUE_KEY, *reversed(raw))
+            raise
+        drained += len(events)
+        if len(raw) < settings.EVENT_DRAIN_BATCH_SIZE:
+            break
+    return drained
+
+
+async def _write_memory_batch(events: List[dict]) -> None:
+    # Rejected events are dead-lettered by write_events; this only catches
+    # failures of the whole batch, such as the database being unreachable
+    try:
+        async with async_session() as db:
+            await write_events(db, events)
+    except Exception as e:
+        logger.error(f"Queued event batch failed: {str(e)}")
+        _dead_letters.extend({"event": event, "error": str(e)} for event in events)
+
+
+async def _drain_memory_queue() -> None:
+    global _write_task
+    queue = _get_queue()
+    while True:
+        events = [await queue.get()]
+        while len(events) < settings.EVENT_DRAIN_BATCH_SIZE and not queue.empty():
+            events.append(queue.get_nowait())
+        # Shielded so stopping the writer never drops a batch already taken
+        # off the queue; stop_event_writer awaits it instead
+        _write_task = asyncio.ensure_future(_write_memory_batch(events))
+        await asyncio.shield(_write_task)
+        _write_task = None
+
+
+def start_event_writer() -> None:
+    """Start draining the in-process queue (memory write-behind mode)"""
+    global _drain_task
+    if settings.EVENT_WRITE_MODE != "memory" or _drain_task is not None:
+        return
+    _drain_task = asyncio.create_task(_drain_memory_queue())
+
+
+async def stop_event_writer() -> None:
+    """Flush what is left in the in-process queue and stop the writer"""
+    global _drain_task
+    if _drain_task is None:
+        return
+    _drain_task.cancel()
+    try:
+        await _drain_task
+    except asyncio.CancelledError:
+        pass
+    _drain_task = None
+    if _write_task is not None:
+        await _write_task
+
+    queue = _get_queue()
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    if events:
+        async with async_session() as db:
+            await write_events(db, events)
+
+
+async def get_dead_letters(limit: int = 100) -> List[dict]:
+    """Most recent rejected events with their errors"""
+    if settings.EVENT_WRITE_MODE == "memory":
+        return list(_dead_letters)[-limit:]
+    try:
+        raw = await get_redis().lrange(settings.EVENT_DEAD_LETTER_KEY, -limit, -1)
+    except RedisError as e:
+        logger.error(f"Dead letters unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event queue unavailable"
+        )
+    return [json.loads(item) for item in raw]
@@ -0,0 +1,293 @@
+import asyncio
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, delete, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+from app.models import Department, Person, PersonEvent, PersonEventId
+from app.services.event_partitions import (
+    detach_event_partition, is_partitioned, list_event_partitions
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional, only needed for EVENT_ARCHIVE_FORMAT=parquet
+    pyarrow = None
+
+settings = get_settings()
+logger = setup_logging()
+
+# Archived columns; the feature vector is left out to keep archives small
+ARCHIVE_COLUMNS = [
+    PersonEvent.event_id, PersonEvent.person_id, PersonEvent.access_time,
+    PersonEvent.device_id, PersonEvent.image, PersonEvent.video, PersonEvent.age,
+    PersonEvent.gender, PersonEvent.score, PersonEvent.quality,
+    PersonEvent.created_at, PersonEvent.updated_at, PersonEvent.deleted_at,
+    PersonEvent.status,
+]
+
+# Event image directories are named after the capture day, e.g. 20240131
+IMAGE_DIR_FORMAT = "%Y%m%d"
+
+
+def _cutoff(days: int, now: datetime) -> Optional[datetime]:
+    """Events older than the cutoff expire; 0 days keeps them forever"""
+    return now - timedelta(days=days) if days > 0 else None
+
+
+def _policy_cutoff(now: datetime):
+    """Per-row cutoff: person type override, then unit override, then default
+
+    Events without a person (unknown faces) fall back to the default.
+    """
+    whens = [
+        (Person.type == type_id, _cutoff(days, now))
+        for type_id, days in settings.EVENT_RETENTION_TYPE_DAYS.items()
+    ] + [
+        (Department.unit_id == unit_id, _cutoff(days, now))
+        for unit_id, days in settings.EVENT_RETENTION_UNIT_DAYS.items()
+    ]
+    default = _cutoff(settings.EVENT_RETENTION_DAYS, now)
+    if not whens:
+        return default
+    return case(*whens, else_=default)
+
+
+def _cutoffs(now: datetime) -> List[Optional[datetime]]:
+    days = [settings.EVENT_RETENTION_DAYS,
+            *settings.EVENT_RETENTION_TYPE_DAYS.values(),
+            *settings.EVENT_RETENTION_UNIT_DAYS.values()]
+    return [_cutoff(d, now) for d in days]
+
+
+def _bytes(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def _parquet_schema():
+    """Fixed schema so batches with all-null columns still line up"""
+    timestamp = pyarrow.timestamp("us")
+    return pyarrow.schema([
+        ("event_id", pyarrow.string()), ("person_id", pyarrow.string()),
+        ("access_time", timestamp), ("device_id", pyarrow.int64()),
+        ("image", pyarrow.string()), ("video", pyarrow.string()),
+        ("age", pyarrow.int64()), ("gender", pyarrow.bool_()),
+        ("score", pyarrow.float64()), ("quality", pyarrow.float64()),
+        ("created_at", timestamp), ("updated_at", timestamp),
+        ("deleted_at", timestamp), ("status", pyarrow.bool_()),
+    ])
+
+
+class EventArchive:
+    """Archive of one retention run, gzip NDJSON or Parquet
+
+    Every write is on disk and readable before it returns, so the caller can
+    delete the rows afterwards. NDJSON appends to one file and flushes it;
+    Parquet has no footer until the file is closed, so each write becomes its
+    own complete file.
+    """
+
+    def __init__(self, directory: str, started: datetime):
+        os.makedirs(directory, exist_ok=True)
+        parquet = settings.EVENT_ARCHIVE_FORMAT == "parquet"
+        if parquet and pyarrow is None:
+            logger.warning("pyarrow is not installed, archiving events as NDJSON")
+            parquet = False
+        self._base = os.path.join(directory, f"person_event_{started:%Y%m%d%H%M%S}")
+        self.paths: List[str] = []
+        self.rows = 0
+        self._parquet = parquet
+        self._file = None
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        if self._parquet:
+            path = f"{self._base}_{len(self.paths):05d}.parquet"
+            pyarrow.parquet.write_table(
+                pyarrow.Table.from_pylist(rows, schema=_parquet_schema()), path)
+            self.paths.append(path)
+            return
+        if self._file is None:
+            path = self._base + ".ndjson.gz"
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+            self.paths.append(path)
+        for row in rows:
+            self._file.write(json.dumps(row, default=str) + "\n")
+        # Rows must be on disk before their delete commits
+        self._file.flush()
+
+    async def write(self, rows: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._write, rows)
+        self.rows += len(rows)
+
+    def close(self) -> int:
+        """Close the archive and return its size, 0 if nothing was archived"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return sum(os.path.getsize(path) for path in self.paths)
+
+
+async def _archive_partition(
+    db: AsyncSession,
+    name: str,
+    archive: EventArchive,
+    batch_size: int
+) -> None:
+    """Copy a whole partition into the archive, keyset-paged by primary key"""
+    columns = ", ".join(column.key for column in ARCHIVE_COLUMNS)
+    last = None
+    while True:
+        where = "WHERE (event_id, access_time) > (:event_id, :access_time)" if last else ""
+        result = await db.execute(
+            text(f"SELECT {columns} FROM {name} {where} "
+                 f"ORDER BY event_id, access_time LIMIT :limit"),
+            {"limit": batch_size, **(last or {})}
+        )
+        rows = [dict(row) for row in result.mappings().all()]
+        if not rows:
+            return
+        await archive.write(rows)
+        last = {"event_id": rows[-1]["event_id"], "access_time": rows[-1]["access_time"]}
+
+
+async def _drop_expired_partitions(
+    db: AsyncSession,
+    archive: EventArchive,
+    cutoff: datetime
+) -> Dict[str, int]:
+    """Archive and drop monthly partitions that ended before `cutoff`"""
+    dropped = {"partitions": 0, "rows": 0, "bytes": 0}
+    for name, lower, upper in await list_event_partitions(db):
+        if upper > cutoff:
+            break
+        size = await db.scalar(
+            text("SELECT pg_total_relation_size(to_regclass(:name))"), {"name": name})
+        archived = archive.rows
+        await _archive_partition(db, name, archive, settings.EVENT_RETENTION_BATCH_SIZE)
+        # Released ids commit together with the drop
+        await db.execute(delete(PersonEventId).where(
+            PersonEventId.access_time >= lower, PersonEventId.access_time < upper))
+        await detach_event_partition(db, name, drop=True)
+        dropped["partitions"] += 1
+        dropped["rows"] += archive.rows - archived
+        dropped["bytes"] += size or 0
+        logger.info(f"Dropped expired event partition {name}")
+    return dropped
+
+
+async def _delete_expired_rows(
+    db: AsyncSession,
+    archive: EventArchive,
+    now: datetime,
+    latest: datetime
+) -> int:
+    """Archive then delete expired rows in batches, one commit per batch"""
+    expired = select(*ARCHIVE_COLUMNS).select_from(PersonEvent).outerjoin(
+        Person, Person.id == PersonEvent.person_id
+    ).outerjoin(
+        Department, Department.id == Person.department_id
+    ).where(
+        # Plain bound on the indexed column; no policy expires anything newer
+        PersonEvent.access_time < latest,
+        PersonEvent.access_time < _policy_cutoff(now)
+    ).order_by(PersonEvent.access_time).limit(settings.EVENT_RETENTION_BATCH_SIZE)
+
+    deleted = 0
+    for _ in range(settings.EVENT_RETENTION_MAX_BATCHES):
+        rows = [dict(row) for row in (await db.execute(expired)).mappings().all()]
+        if not rows:
+            break
+        await archive.write(rows)
+        keys = [(row["event_id"], row["access_time"]) for row in rows]
+        await db.execute(
+            delete(PersonEvent)
+            .where(tuple_(PersonEvent.event_id, PersonEvent.access_time).in_(keys))
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(delete(PersonEventId).where(
+            PersonEventId.event_id.in_([event_id for event_id, _ in keys])))
+        await db.commit()
+        deleted += len(rows)
+        if len(rows) < settings.EVENT_RETENTION_BATCH_SIZE:
+            break
+    return deleted
+
+
+def _remove_image_dirs(cutoff: datetime) -> Dict[str, int]:
+    """Remove dated event image directories from days before `cutoff`"""
+    removed = {"directories": 0, "bytes": 0}
+    root = settings.get_event_path
+    if not os.path.isdir(root):
+        return removed
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        try:
+            day = datetime.strptime(name, IMAGE_DIR_FORMAT)
+        except ValueError:
+            continue
+        if not os.path.isdir(path) or day + timedelta(days=1) > cutoff:
+            continue
+        size = _bytes(path)
+        shutil.rmtree(path, ignore_errors=True)
+        removed["directories"] += 1
+        removed["bytes"] += size
+    return removed
+
+
+async def apply_event_retention(db: AsyncSession) -> Dict[str, Any]:
+    """Archive and remove person events past their retention, plus old images
+
+    The retention of an event comes from EVENT_RETENTION_TYPE_DAYS for its
+    person type, else EVENT_RETENTION_UNIT_DAYS for its department's unit,
+    else EVENT_RETENTION_DAYS. Monthly partitions that every policy has
+    expired are archived and dropped whole; remaining rows are archived and
+    deleted in batches. Image directories are removed once every policy has
+    expired their day, so never while any policy keeps events forever.
+
+    Returns:
+        Report with rows archived and deleted, partitions and directories
+        dropped, the archive files and the bytes reclaimed
+    """
+    now = settings.datetime_now
+    cutoffs = _cutoffs(now)
+    report = {"archives": [], "archived": 0, "deleted": 0, "partitions_dropped": 0,
+              "directories_removed": 0, "bytes_reclaimed": 0, "archive_bytes": 0}
+    active = [cutoff for cutoff in cutoffs if cutoff is not None]
+    if not active:
+        return report
+    # Everything older than `earliest` is expired under every policy
+    earliest = min(cutoffs) if None not in cutoffs else None
+    latest = max(active)
+
+    archive = EventArchive(settings.get_event_archive_path, now)
+    try:
+        if earliest is not None and await is_partitioned(db):
+            dropped = await _drop_expired_partitions(db, archive, earliest)
+            report["partitions_dropped"] = dropped["partitions"]
+            report["deleted"] += dropped["rows"]
+            report["bytes_reclaimed"] += dropped["bytes"]
+        report["deleted"] += await _delete_expired_rows(db, archive, now, latest)
+    finally:
+        report["archive_bytes"] = archive.close()
+    report["archived"] = archive.rows
+    report["archives"] = archive.paths
+
+    if earliest is not None:
+        images = await asyncio.to_thread(_remove_image_dirs, earliest)
+        report["directories_removed"] = images["directories"]
+        report["bytes_reclaimed"] += images["bytes"]
+
+    logger.info(f"Event retention: {report}")
+    return report
@@ -0,0 +1,402 @@
+import asyncio
+from collections import namedtuple
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.models import Person
+from app.schemas.person import FaceSearchResult
+from .face_index import IVFIndex, assign_to_centroids, top_k_indices
+
+settings = get_settings()
+
+# Columns needed to score and describe a gallery entry
+GALLERY_COLUMNS = (
+    Person.id,
+    Person.department_id,
+    Person.name,
+    Person.code,
+    Person.type,
+    Person.image,
+    Person.feature,
+)
+GalleryRow = namedtuple("GalleryRow", [column.key for column in GALLERY_COLUMNS])
+
+# Tombstones tolerated before the matrix is compacted
+COMPACT_MIN_TOMBSTONES = 1024
+
+
+def normalize_embedding(feature) -> np.ndarray:
+    """Convert a feature vector to a unit-length float32 array"""
+    vector = np.asarray(feature, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return vector
+    return vector / norm
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normalize every row of a float32 matrix in place"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+def to_similarity(score: float) -> float:
+    """Map a raw cosine score to the similarity reported by the API"""
+    return min(round(float(score), 2) * 2, 1.0)
+
+
+def get_search_nprobe(unit_id: Optional[int] = None) -> Optional[int]:
+    """Inverted lists to probe for a unit, or None for exact search"""
+    if settings.FACE_SEARCH_MODE != "ivf":
+        return None
+    return settings.FACE_IVF_UNIT_NPROBE.get(unit_id, settings.FACE_IVF_NPROBE)
+
+
+def is_gallery_enabled() -> bool:
+    """The in-memory gallery needs delta sync when several workers serve requests
+
+    Without it a person write would only reach the gallery of the worker
+    that handled it, and the other workers would keep matching stale faces.
+    """
+    if not settings.FACE_GALLERY_ENABLED:
+        return False
+    return settings.FACE_GALLERY_SYNC_ENABLED or settings.APP_WORKERS <= 1
+
+
+def _has_feature(feature) -> bool:
+    return feature is not None and len(feature) > 0
+
+
+def gallery_record(row) -> tuple:
+    """Result fields of a gallery row, in build_search_result order"""
+    return (row.id, row.department_id, row.name, row.code, row.type, row.image)
+
+
+def upsert_delta(person) -> dict:
+    """Build a gallery delta that adds or replaces a person"""
+    data = {column.key: getattr(person, column.key) for column in GALLERY_COLUMNS}
+    if data["feature"] is not None:
+        data["feature"] = np.asarray(data["feature"], dtype=np.float32).tolist()
+    return {"op": "upsert", "person": data}
+
+
+def remove_delta(person_id: str) -> dict:
+    """Build a gallery delta that tombstones a person"""
+    return {"op": "remove", "person_id": person_id}
+
+
+def build_search_result(record: tuple, similarity: float) -> FaceSearchResult:
+    """Build a search result from a gallery record"""
+    person_id, department_id, name, code, person_type, image = record
+    return FaceSearchResult(
+        person_id=person_id,
+        name=name,
+        code=code,
+        department_id=department_id,
+        type=person_type,
+        similarity=similarity,
+        image=image
+    )
+
+
+async def load_gallery_rows(
+    db: AsyncSession,
+    department_ids: Optional[Sequence[int]] = None
+) -> Sequence:
+    """Fetch only the gallery columns of active persons as plain rows
+
+    Rows bypass ORM entity construction and the identity map, which is most
+    of the cost of select(Person) on large galleries.
+    """
+    query = select(*GALLERY_COLUMNS).where(
+        Person.deleted_at.is_(None),
+        Person.feature.isnot(None),
+    )
+    if department_ids is not None:
+        query = query.where(Person.department_id.in_(department_ids))
+    result = await db.execute(query)
+    return [row for row in result.all() if _has_feature(row.feature)]
+
+
+class FaceGallery:
+    """Process-resident matrix of normalized person embeddings
+
+    Rows of `embeddings` line up with `department_ids` and `records`, so a
+    search is a single matrix-vector product followed by a top-k selection.
+    Person writes are applied as deltas: a row is appended, overwritten in
+    place or tombstoned, and tombstones are compacted away once they pile up.
+    An optional IVF index narrows a search to the rows near the query.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.is_loaded = False
+        self.version = 0
+        # Optional coroutine returning the shared delta version, set by the sync module
+        self.fetch_version: Optional[Callable[[], Awaitable[int]]] = None
+        # Deltas received while a load is running, replayed once it finishes
+        self._loading = False
+        self._pending: List[dict] = []
+        self._allocate(0, 0)
+
+    def _allocate(self, size: int, dimension: int) -> None:
+        self._size = 0
+        self._tombstones = 0
+        self._embeddings = np.zeros((size, dimension), dtype=np.float32)
+        self._department_ids = np.zeros(size, dtype=np.int64)
+        self._active = np.zeros(size, dtype=bool)
+        self._positions: Dict[str, int] = {}
+        self.records: List[Optional[tuple]] = []
+        self.index: Optional[IVFIndex] = None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @property
+    def dimension(self) -> int:
+        return self._embeddings.shape[1]
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self._embeddings[:self._size]
+
+    @property
+    def department_ids(self) -> np.ndarray:
+        return self._department_ids[:self._size]
+
+    def invalidate(self) -> None:
+        """Drop the loaded gallery so the next search reloads it"""
+        self.is_loaded = False
+
+    def _build(self, rows: Sequence) -> None:
+        rows = [row for row in rows if _has_feature(row.feature)]
+        if not rows:
+            self._allocate(0, 0)
+            return
+
+        dimension = len(rows[0].feature)
+        rows = [row for row in rows if len(row.feature) == dimension]
+        self._allocate(len(rows), dimension)
+        for index, row in enumerate(rows):
+            self._embeddings[index] = row.feature
+        normalize_rows(self._embeddings)
+
+        self._department_ids[:] = [row.department_id for row in rows]
+        self._active[:] = True
+        self._size = len(rows)
+        self.records = [gallery_record(row) for row in rows]
+        self._positions = {row.id: index for index, row in enumerate(rows)}
+
+    def build_index(self, nlist: Optional[int] = None) -> None:
+        """Train an IVF index over the current rows"""
+        self.index = IVFIndex.build(self.embeddings, nlist) if self._size else None
+
+    def _grow(self) -> None:
+        capacity = max(16, self._embeddings.shape[0] * 2)
+        embeddings = np.zeros((capacity, self.dimension), dtype=np.float32)
+        embeddings[:self._size] = self.embeddings
+        department_ids = np.zeros(capacity, dtype=np.int64)
+        department_ids[:self._size] = self.department_ids
+        active = np.zeros(capacity, dtype=bool)
+        active[:self._size] = self._active[:self._size]
+        self._embeddings = embeddings
+        self._department_ids = department_ids
+        self._active = active
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._active[:self._size])
+        records = [self.records[index] for index in keep]
+        self._embeddings = self.embeddings[keep]
+        self._department_ids = self.department_ids[keep]
+        self._active = np.ones(keep.size, dtype=bool)
+        self._size = keep.size
+        self._tombstones = 0
+        self.records = records
+        self._positions = {record[0]: index for index, record in enumerate(records)}
+        if self.index is not None:
+            centroids = self.index.centroids
+            self.index = IVFIndex(
+                centroids, assign_to_centroids(self.embeddings, centroids))
+
+    def upsert(self, row) -> None:
+        """Add a person row or replace it in place"""
+        if not _has_feature(row.feature):
+            self.remove(row.id)
+            return
+        if self._size == 0 and len(row.feature) != self.dimension:
+            self._allocate(0, len(row.feature))
+        if len(row.feature) != self.dimension:
+            self.remove(row.id)
+            return
+
+        position = self._positions.get(row.id)
+        if position is None:
+            if self._size == self._embeddings.shape[0]:
+                self._grow()
+            position = self._size
+            self._size += 1
+            self.records.append(None)
+            self._positions[row.id] = position
+
+        self._embeddings[position] = normalize_embedding(row.feature)
+        self._department_ids[position] = row.department_id
+        self._active[position] = True
+        self.records[position] = gallery_record(row)
+        if self.index is not None:
+            self.index.add(position, self._embeddings[position])
+
+    def remove(self, person_id: str) -> None:
+        """Tombstone a person row"""
+        position = self._positions.pop(person_id, None)
+        if position is None:
+            return
+        self._active[position] = False
+        self.records[position] = None
+        self._tombstones += 1
+        if self._tombstones > max(COMPACT_MIN_TOMBSTONES, self._size // 4):
+            self._compact()
+
+    def apply_delta(self, delta: dict) -> bool:
+        """Apply a versioned upsert/remove delta
+
+        Deltas at or below the current version are duplicates and ignored.
+        A gap in the version sequence means a delta was missed, so the
+        gallery is invalidated and reloaded on the next search. Deltas that
+        arrive during a load are held back and applied after it.
+        """
+        if self._loading:
+            self._pending.append(delta)
+            return False
+        version = delta.get("version", self.version + 1)
+        if version <= self.version:
+            return False
+        if version != self.version + 1:
+            self.invalidate()
+            return False
+        self.version = version
+        if not self.is_loaded:
+            return False
+
+        if delta["op"] == "upsert":
+            self.upsert(GalleryRow(**delta["person"]))
+        elif delta["op"] == "remove":
+            self.remove(delta["person_id"])
+        return True
+
+    async def load(self, db: AsyncSession) -> None:
+        """Load all active embeddings from the database
+
+        Deltas received meanwhile are replayed on top of the loaded rows.
+        Those at or below the version read before the rows are already in
+        them and are skipped; replaying the others is harmless since upserts
+        and removes are idempotent.
+        """
+        self._loading = True
+        self._pending = []
+        try:
+            version = await self.fetch_version() if self.fetch_version else self.version
+            self._build(await load_gallery_rows(db))
+            if settings.FACE_SEARCH_MODE == "ivf" and self._size >= settings.FACE_IVF_MIN_SIZE:
+                self.build_index(settings.FACE_IVF_NLIST or None)
+            self.version = version
+            self.is_loaded = True
+        finally:
+            self._loading = False
+            pending, self._pending = self._pending, []
+            for delta in pending:
+                self.apply_delta(delta)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if self.is_loaded:
+            return
+        async with self._lock:
+            if not self.is_loaded:
+                await self.load(db)
+
+    def _candidate_mask(self, department_ids: Sequence[int]) -> np.ndarray:
+        return self._active[:self._size] & np.isin(
+            self.department_ids, np.asarray(department_ids, dtype=np.int64))
+
+    def search(
+        self,
+        embedding: np.ndarray,
+        department_ids: Sequence[int],
+        top_k: int = 1,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[float, tuple]]:
+        """Return up to top_k (score, record) pairs within the departments
+
+        With `nprobe` set and an index built, only the rows in the nprobe
+        closest inverted lists are scored; otherwise the search is exact.
+        """
+        if not self._positions or embedding.shape[0] != self.dimension:
+            return []
+
+        if nprobe and self.index is not None:
+            positions, scores = self.index.search(
+                self.embeddings, embedding, self._candidate_mask(department_ids),
+                top_k, nprobe)
+            return [
+                (float(score), self.records[position])
+                for position, score in zip(positions, scores)
+            ]
+
+        return self.search_batch(embedding[np.newaxis, :], department_ids, top_k)[0]
+
+    def search_batch(
+        self,
+        embeddings: np.ndarray,
+        department_ids: Sequence[int],
+        top_k: int = 1,
+        nprobe: Optional[int] = None
+    ) -> List[List[Tuple[float, tuple]]]:
+        """Search several embeddings with one matrix-matrix product"""
+        if nprobe and self.index is not None:
+            return [
+                self.search(embedding, department_ids, top_k, nprobe)
+                for embedding in embeddings
+            ]
+        if not self._positions or embeddings.shape[1] != self.dimension:
+            return [[] for _ in embeddings]
+
+        candidates = np.flatnonzero(self._candidate_mask(department_ids))
+        if candidates.size == 0:
+            return [[] for _ in embeddings]
+
+        # Score only the candidate rows when they are a small share of the gallery
+        if candidates.size * 2 < self._size:
+            scores = self.embeddings[candidates] @ embeddings.T
+        else:
+            scores = (self.embeddings @ embeddings.T)[candidates]
+
+        return [
+            [(float(column[i]), self.records[candidates[i]])
+             for i in top_k_indices(column, top_k)]
+            for column in scores.T
+        ]
+
+
+def rank_embeddings(
+    embeddings: np.ndarray,
+    features: Sequence,
+    top_k: int = 1
+) -> List[List[Tuple[int, float]]]:
+    """Score an ad-hoc list of features against each embedding
+
+    Returns one list of (feature index, score) pairs per embedding.
+    """
+    if not len(features):
+        return [[] for _ in embeddings]
+    matrix = normalize_rows(np.asarray(features, dtype=np.float32))
+    scores = matrix @ embeddings.T
+    return [
+        [(int(i), float(column[i])) for i in top_k_indices(column, top_k)]
+        for column in scores.T
+    ]
+
+
+face_gallery = FaceGallery()
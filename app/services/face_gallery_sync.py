@@ -0,0 +1,81 @@
+import asyncio
+import json
+from typing import Optional
+from redis.exceptions import RedisError
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+from app.core.redis import get_redis
+from app.services.face_gallery import face_gallery
+
+settings = get_settings()
+logger = setup_logging()
+
+_listener: Optional[asyncio.Task] = None
+
+
+async def _fetch_version() -> int:
+    version = await get_redis().get(settings.FACE_GALLERY_VERSION_KEY)
+    return int(version or 0)
+
+
+async def publish_gallery_delta(delta: dict) -> None:
+    """Apply a gallery delta locally and broadcast it to the other workers
+
+    Every delta gets the next value of a shared Redis counter so workers can
+    spot gaps in the sequence and resync from the database.
+    """
+    if not settings.FACE_GALLERY_SYNC_ENABLED:
+        face_gallery.apply_delta(delta)
+        return
+
+    try:
+        redis = get_redis()
+        version = await redis.incr(settings.FACE_GALLERY_VERSION_KEY)
+        message = {**delta, "version": version}
+        face_gallery.apply_delta(message)
+        await redis.publish(settings.FACE_GALLERY_CHANNEL, json.dumps(message))
+    except RedisError as e:
+        logger.warning(f"Face gallery delta not published: {str(e)}")
+        face_gallery.invalidate()
+
+
+async def _listen() -> None:
+    while True:
+        pubsub = get_redis().pubsub()
+        try:
+            await pubsub.subscribe(settings.FACE_GALLERY_CHANNEL)
+            # Deltas may have been missed while unsubscribed
+            face_gallery.invalidate()
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                face_gallery.apply_delta(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Face gallery subscription lost: {str(e)}")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+def start_gallery_sync() -> None:
+    """Start listening for gallery deltas from other workers"""
+    global _listener
+    if not settings.FACE_GALLERY_SYNC_ENABLED or _listener is not None:
+        return
+    face_gallery.fetch_version = _fetch_version
+    _listener = asyncio.create_task(_listen())
+
+
+async def stop_gallery_sync() -> None:
+    """Stop the gallery delta listener"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.cancel()
+    try:
+        await _listener
+    except asyncio.CancelledError:
+        pass
+    _listener = None
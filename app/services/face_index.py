@@ -0,0 +1,125 @@
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Upper bound on vectors used to train the coarse centroids
+TRAIN_SAMPLES_PER_LIST = 64
+MAX_TRAIN_SAMPLES = 65536
+# Rows scored per block when assigning vectors to centroids
+ASSIGN_CHUNK_SIZE = 8192
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the k highest scores, best first"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        indices = np.argpartition(-scores, k - 1)[:k]
+    else:
+        indices = np.arange(scores.size)
+    return indices[np.argsort(-scores[indices], kind="stable")]
+
+
+def auto_nlist(size: int) -> int:
+    """Default number of inverted lists for a gallery of the given size"""
+    return max(1, int(np.sqrt(size)))
+
+
+def assign_to_centroids(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the nearest centroid (by cosine) for every row"""
+    assignments = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], ASSIGN_CHUNK_SIZE):
+        block = data[start:start + ASSIGN_CHUNK_SIZE]
+        assignments[start:start + block.shape[0]] = np.argmax(
+            block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(
+    data: np.ndarray,
+    nlist: int,
+    n_iter: int = 10,
+    seed: int = 0
+) -> np.ndarray:
+    """Train spherical k-means centroids on a sample of normalized rows"""
+    rng = np.random.default_rng(seed)
+    nlist = min(nlist, data.shape[0])
+    sample_size = min(data.shape[0], max(
+        nlist, min(MAX_TRAIN_SAMPLES, nlist * TRAIN_SAMPLES_PER_LIST)))
+    sample = data[rng.choice(data.shape[0], sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = assign_to_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=nlist)
+        # Re-seed empty clusters from random sample rows
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            sums[empty] = sample[rng.choice(sample_size, empty.size)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index over the rows of a face gallery
+
+    Each gallery position is assigned to its nearest coarse centroid. A
+    search scores only the rows in the `nprobe` lists whose centroids are
+    closest to the query.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray):
+        self.centroids = centroids
+        self._assignments = assignments
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        self._lists: List[np.ndarray] = [
+            order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))
+        ]
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, nlist: Optional[int] = None) -> "IVFIndex":
+        centroids = train_centroids(embeddings, nlist or auto_nlist(len(embeddings)))
+        return cls(centroids, assign_to_centroids(embeddings, centroids))
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def add(self, position: int, embedding: np.ndarray) -> None:
+        """Assign a new or replaced gallery position to its nearest list"""
+        centroid = int(np.argmax(self.centroids @ embedding))
+        if position < self._assignments.size:
+            previous = int(self._assignments[position])
+            if previous == centroid:
+                return
+            if previous >= 0:
+                self._lists[previous] = self._lists[previous][
+                    self._lists[previous] != position]
+        else:
+            assignments = np.full(
+                max(position + 1, self._assignments.size * 2), -1, dtype=np.int64)
+            assignments[:self._assignments.size] = self._assignments
+            self._assignments = assignments
+        self._assignments[position] = centroid
+        self._lists[centroid] = np.append(self._lists[centroid], position)
+
+    def search(
+        self,
+        embeddings: np.ndarray,
+        embedding: np.ndarray,
+        mask: np.ndarray,
+        top_k: int,
+        nprobe: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (positions, scores) of the best rows allowed by the mask"""
+        probe = top_k_indices(self.centroids @ embedding, nprobe)
+        positions = np.concatenate([self._lists[c] for c in probe])
+        positions = positions[mask[positions]]
+        scores = embeddings[positions] @ embedding
+        best = top_k_indices(scores, top_k)
+        return positions[best], scores[best]
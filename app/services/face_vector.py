@@ -0,0 +1,172 @@
+from typing import Any, List, Optional, Sequence, Tuple
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+
+settings = get_settings()
+logger = setup_logging()
+
+# Dimension of the person.feature_vec column (migration 04)
+VECTOR_DIMENSION = 512
+
+# Cached result of the extension/column check, None until first checked
+_is_available: Optional[bool] = None
+
+CHECK_AVAILABLE = text("""
+    SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'vector')
+       AND EXISTS (
+           SELECT 1 FROM pg_attribute
+           WHERE attrelid = 'person'::regclass
+             AND attname = 'feature_vec'
+             AND NOT attisdropped
+       )
+""")
+
+SEARCH_NEAREST = text("""
+    SELECT id, department_id, name, code, type, image,
+           1 - (feature_vec <=> CAST(CAST(:embedding AS text) AS vector)) AS score
+    FROM person
+    WHERE deleted_at IS NULL
+      AND feature_vec IS NOT NULL
+      AND department_id = ANY(:department_ids)
+    ORDER BY feature_vec <=> CAST(CAST(:embedding AS text) AS vector)
+    LIMIT :top_k
+""")
+
+# Same ranking without the HNSW index: the "+ 0" stops the planner from
+# using it, so every person in the departments is scored
+SEARCH_EXACT = text("""
+    SELECT id, department_id, name, code, type, image,
+           1 - (feature_vec <=> CAST(CAST(:embedding AS text) AS vector)) AS score
+    FROM person
+    WHERE deleted_at IS NULL
+      AND feature_vec IS NOT NULL
+      AND department_id = ANY(:department_ids)
+    ORDER BY (feature_vec <=> CAST(CAST(:embedding AS text) AS vector)) + 0
+    LIMIT :top_k
+""")
+
+VECTOR_VERSION = text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+
+# pgvector 0.8 can keep scanning the HNSW graph until enough rows pass the filter
+_iterative_scan: Optional[bool] = None
+
+UPDATE_VECTOR = text("""
+    UPDATE person
+    SET feature_vec = CAST(CAST(:embedding AS text) AS vector)
+    WHERE id = :person_id
+""")
+
+
+def to_vector_literal(embedding) -> Optional[str]:
+    """Format an embedding as a pgvector text literal"""
+    if embedding is None:
+        return None
+    vector = np.asarray(embedding, dtype=np.float32)
+    return "[" + ",".join(f"{value:.7g}" for value in vector) + "]"
+
+
+async def is_pgvector_available(db: AsyncSession) -> bool:
+    """Check once per process that the extension and mirror column exist"""
+    global _is_available
+    if not settings.PGVECTOR_ENABLED:
+        return False
+    if _is_available is None:
+        try:
+            _is_available = bool(await db.scalar(CHECK_AVAILABLE))
+        except DBAPIError as e:
+            logger.warning(f"pgvector check failed: {str(e)}")
+            _is_available = False
+        if not _is_available:
+            logger.warning("pgvector is not available, using in-process face search")
+    return _is_available
+
+
+async def _supports_iterative_scan(db: AsyncSession) -> bool:
+    """Check once per process for pgvector 0.8+"""
+    global _iterative_scan
+    if _iterative_scan is None:
+        version = await db.scalar(VECTOR_VERSION) or "0"
+        parts = tuple(int(part) for part in version.split(".")[:2] if part.isdigit())
+        _iterative_scan = parts >= (0, 8)
+    return _iterative_scan
+
+
+async def search_nearest(
+    db: AsyncSession,
+    embeddings: np.ndarray,
+    department_ids: Sequence[int],
+    top_k: int = 1
+) -> List[List[Tuple[float, tuple]]]:
+    """Rank persons server-side with the pgvector cosine distance operator
+
+    The department filter is applied to the HNSW candidates, so a small
+    unit in a large gallery can get fewer than `top_k` rows back. On
+    pgvector 0.8+ the scan is made iterative. Any short result is re-run as
+    an exact search over the departments.
+    """
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.PGVECTOR_EF_SEARCH)}"))
+    if await _supports_iterative_scan(db):
+        await db.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+    matches = []
+    for embedding in embeddings:
+        params = {
+            "embedding": to_vector_literal(embedding),
+            "department_ids": list(department_ids),
+            "top_k": top_k,
+        }
+        rows = (await db.execute(SEARCH_NEAREST, params)).all()
+        if len(rows) < top_k:
+            rows = (await db.execute(SEARCH_EXACT, params)).all()
+        # relaxed_order may return rows slightly out of order
+        ranked = sorted(
+            ((float(row.score), tuple(row[:6])) for row in rows),
+            key=lambda match: match[0], reverse=True)
+        matches.append(ranked)
+    return matches
+
+
+def check_vector_dimension(feature) -> Optional[str]:
+    """Error message when a feature does not fit the vector(512) column"""
+    size = len(feature) if feature is not None else 0
+    if size != VECTOR_DIMENSION:
+        return f"Face feature must have {VECTOR_DIMENSION} values, got {size}"
+    return None
+
+
+async def sync_person_vector(db: AsyncSession, person_id: str, feature) -> None:
+    """Mirror Person.feature into the pgvector column
+
+    Runs in the caller's transaction; flush the person row first and commit
+    afterwards so the row and its vector are saved together.
+
+    Raises:
+        HTTPException: 400 if the feature does not have VECTOR_DIMENSION values
+    """
+    if not await is_pgvector_available(db):
+        return
+    error = check_vector_dimension(feature)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    await db.execute(UPDATE_VECTOR, {
+        "embedding": to_vector_literal(feature),
+        "person_id": person_id,
+    })
+
+
+async def sync_person_vectors(db: AsyncSession, items: Sequence[Tuple[str, Any]]) -> None:
+    """Mirror several (person_id, feature) pairs in one executemany
+
+    Runs in the caller's transaction; features must already have been
+    checked with check_vector_dimension.
+    """
+    if not items or not await is_pgvector_available(db):
+        return
+    await db.execute(UPDATE_VECTOR, [
+        {"embedding": to_vector_literal(feature), "person_id": person_id}
+        for person_id, feature in items
+    ])
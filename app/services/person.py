@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from app.models import Person
-from app.schemas.person import PersonCreate, PersonUpdate, Person as PersonSchema, FaceSearchResult, FaceSearchResponse, FaceDetectResponse
+from app.schemas.person import PersonCreate, PersonUpdate, Person as PersonSchema, FaceSearchResult, FaceSearchResponse, FaceDetectResponse, FaceSearchBatchItem, FaceSearchBatchResponse
 from app.schemas.common import PaginationResponse
 from fastapi import HTTPException, status
 from app.core.config import get_settings
@@ -12,13 +12,28 @@ from .department import get_department_by_id
 from .person_type import get_person_type_by_id
 import uuid
 import numpy as np
-from app.services.department import get_departments
+from app.services.department_tree import get_unit_department_ids, get_department_subtree_ids
 from app.services.unit import get_unit_by_id
 import time
 from app.utils.helpers import save_base64_image
-from app.services.ai import detect_face
+from app.services.ai import detect_face, detect_faces
 import os
 from app.core.celery.tasks import save_event_image
+from app.services.face_gallery import (
+    face_gallery,
+    is_gallery_enabled,
+    build_search_result,
+    gallery_record,
+    get_search_nprobe,
+    load_gallery_rows,
+    normalize_embedding,
+    rank_embeddings,
+    remove_delta,
+    to_similarity,
+    upsert_delta,
+)
+from app.services.face_gallery_sync import publish_gallery_delta
+from app.services.face_vector import is_pgvector_available, search_nearest, sync_person_vector
 
 settings = get_settings()
 
@@ -86,8 +101,7 @@ async def get_persons(
     # Handle unit_id filter through department relationship
     if unit_id is not None:
         # Get all departments in the unit
-        departments = await get_departments(db, unit_id=unit_id)
-        department_ids = [dept.id for dept in departments.items]
+        department_ids = await get_unit_department_ids(db, unit_id)
         if department_ids:
             conditions.append(Person.department_id.in_(department_ids))
         else:
@@ -183,8 +197,11 @@ async def create_person(db: AsyncSession, person_data: PersonCreate) -> Person:
     )
 
     db.add(db_person)
+    await db.flush()
+    await sync_person_vector(db, db_person.id, db_person.feature)
     await db.commit()
     await db.refresh(db_person)
+    await publish_gallery_delta(upsert_delta(db_person))
     return db_person
 
 
@@ -261,8 +278,12 @@ async def update_person(
     for field, value in update_data.items():
         setattr(person, field, value)
 
+    if "feature" in update_data:
+        await db.flush()
+        await sync_person_vector(db, person.id, person.feature)
     await db.commit()
     await db.refresh(person)
+    await publish_gallery_delta(upsert_delta(person))
     return person
 
 
@@ -273,9 +294,72 @@ async def delete_person(db: AsyncSession, person_id: str) -> bool:
 
     person.deleted_at = settings.datetime_now
     await db.commit()
+    await publish_gallery_delta(remove_delta(person_id))
     return True
 
 
+async def _department_scope(db: AsyncSession, department_id: int) -> list[int]:
+    """Departments searched when a request names a single department"""
+    if settings.SEARCH_INCLUDE_DESCENDANTS:
+        return await get_department_subtree_ids(db, department_id)
+    return [department_id]
+
+
+async def _match_persons_batch(
+    db: AsyncSession,
+    search_embeddings: np.ndarray,
+    department_ids: list[int],
+    num_result: int,
+    unit_id: Optional[int] = None
+) -> list[list[FaceSearchResult]]:
+    """Rank persons in the given departments for each embedding, best first"""
+    top_k = max(num_result, 1)
+
+    if await is_pgvector_available(db):
+        matches = await search_nearest(db, search_embeddings, department_ids, top_k)
+        return [
+            [build_search_result(record, to_similarity(score))
+             for score, record in row]
+            for row in matches
+        ]
+
+    if is_gallery_enabled():
+        await face_gallery.ensure_loaded(db)
+        matches = face_gallery.search_batch(
+            search_embeddings, department_ids, top_k,
+            nprobe=get_search_nprobe(unit_id))
+        return [
+            [build_search_result(record, to_similarity(score))
+             for score, record in row]
+            for row in matches
+        ]
+
+    # Without the in-memory gallery, fetch only the columns needed for scoring
+    rows = await load_gallery_rows(db, department_ids)
+    ranked = rank_embeddings(
+        search_embeddings, [row.feature for row in rows], top_k)
+    return [
+        [
+            build_search_result(gallery_record(rows[index]), to_similarity(score))
+            for index, score in ranking
+        ]
+        for ranking in ranked
+    ]
+
+
+async def _match_persons(
+    db: AsyncSession,
+    search_embedding: np.ndarray,
+    department_ids: list[int],
+    num_result: int,
+    unit_id: Optional[int] = None
+) -> list[FaceSearchResult]:
+    """Rank persons in the given departments by similarity, best first"""
+    matches = await _match_persons_batch(
+        db, search_embedding[np.newaxis, :], department_ids, num_result, unit_id)
+    return matches[0]
+
+
 async def search_face(
     db: AsyncSession,
     base64_image: str,
@@ -318,24 +402,13 @@ async def search_face(
     adjusted_threshold = threshold
     if detect_result.data.wearmask:
         adjusted_threshold = max(0.0, threshold - settings.MASK_THRESHOLD_SUB)
-    # Convert embedding to numpy array and normalize
-    search_embedding = np.array(detect_result.data.feature)
-    search_embedding = search_embedding / np.linalg.norm(search_embedding)
+    # Convert embedding to normalized float32 array
+    search_embedding = normalize_embedding(detect_result.data.feature)
     del detect_result.data.feature
 
-    # Build base query
-    query = (
-        select(Person)
-        .join(Person.department)  # Join with department
-        .where(
-            Person.deleted_at.is_(None),
-            Person.feature.isnot(None),
-        )
-    )
-
     # Get all departments in the unit
-    departments = await get_departments(db, unit_id=unit_id)
-    department_ids = [dept.id for dept in departments.items]
+    department_ids = await get_unit_department_ids(
+        db, unit_id, include_child_units=settings.SEARCH_INCLUDE_DESCENDANTS)
     if not department_ids:
         # Save unknown face image
         current_time = settings.datetime_now.strftime("%H%M%S")
@@ -357,15 +430,13 @@ async def search_face(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Department does not belong to the specified unit"
             )
-        query = query.where(Person.department_id == department_id)
-    else:
-        query = query.where(Person.department_id.in_(department_ids))
+        department_ids = await _department_scope(db, department_id)
 
-    # Execute query
-    result = await db.execute(query)
-    persons = result.scalars().all()
+    # Rank candidates by similarity
+    matches = await _match_persons(
+        db, search_embedding, department_ids, num_result, unit_id)
 
-    if not persons:
+    if not matches:
         # Save unknown face image
         current_time = settings.datetime_now.strftime("%H%M%S")
         image_name = await save_base64_image(
@@ -381,46 +452,13 @@ async def search_face(
             nearest_result=None
         )
 
-    # Calculate similarities for all persons
-    similarities = []
-    for person in persons:
-        if not person.feature:
-            continue
-
-        # Convert stored feature to numpy array and normalize
-        person_embedding = np.array(person.feature)
-        person_embedding = person_embedding / np.linalg.norm(person_embedding)
-
-        # Calculate cosine similarity
-        similarity = min(round(
-            float(np.dot(search_embedding, person_embedding)), 2) * 2, 1.0)
-
-        # Add to similarities list regardless of threshold
-        similarities.append((similarity, person))
-
-    # Sort by similarity in descending order
-    similarities.sort(key=lambda x: x[0], reverse=True)
-
     # Get nearest result (highest similarity) regardless of threshold
-    nearest_person = similarities[0] if similarities else None
-    nearest_result = None
-    if nearest_person:
-        similarity, person = nearest_person
-        nearest_result = FaceSearchResult(
-            person_id=person.id,
-            name=person.name,
-            code=person.code,
-            department_id=person.department_id,
-            type=person.type,
-            similarity=similarity,
-            image=person.image
-        )
+    nearest_result = matches[0]
 
-    # Filter results by threshold
-    threshold_results = [(s, p)
-                         for s, p in similarities if s >= adjusted_threshold]
-    # Take top N results
-    top_results = threshold_results[:num_result]
+    # Filter results by threshold and take top N results
+    top_results = [
+        match for match in matches if match.similarity >= adjusted_threshold
+    ][:num_result]
 
     # Save event image asynchronously
     current_time = settings.datetime_now.strftime("%H%M%S")
@@ -442,30 +480,15 @@ async def search_face(
         )
 
     # Save with person code if match found
-    matched_person = top_results[0][1]
     save_event_image.delay(
         base64_image,
         event_date_path,
-        f"{current_time}_{matched_person.code}.jpg"
+        f"{current_time}_{top_results[0].code}.jpg"
     )
 
-    # Convert to response format
-    search_results = [
-        FaceSearchResult(
-            person_id=person.id,
-            name=person.name,
-            code=person.code,
-            department_id=person.department_id,
-            type=person.type,
-            similarity=similarity,
-            image=person.image
-        )
-        for similarity, person in top_results
-    ]
-
     return FaceSearchResponse(
         request_time=request_time,
-        results=search_results,
+        results=top_results,
         data=[detect_result.data],
         nearest_result=nearest_result
     )
@@ -505,24 +528,13 @@ async def search_face_camera(
     adjusted_threshold = threshold
     if detect_result.data.wearmask:
         adjusted_threshold = max(0.0, threshold - settings.MASK_THRESHOLD_SUB)
-    # Convert embedding to numpy array and normalize
-    search_embedding = np.array(detect_result.data.feature)
-    search_embedding = search_embedding / np.linalg.norm(search_embedding)
+    # Convert embedding to normalized float32 array
+    search_embedding = normalize_embedding(detect_result.data.feature)
     del detect_result.data.feature
 
-    # Build base query
-    query = (
-        select(Person)
-        .join(Person.department)  # Join with department
-        .where(
-            Person.deleted_at.is_(None),
-            Person.feature.isnot(None),
-        )
-    )
-
     # Get all departments in the unit
-    departments = await get_departments(db, unit_id=unit_id)
-    department_ids = [dept.id for dept in departments.items]
+    department_ids = await get_unit_department_ids(
+        db, unit_id, include_child_units=settings.SEARCH_INCLUDE_DESCENDANTS)
     if not department_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -536,15 +548,13 @@ async def search_face_camera(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Department does not belong to the specified unit"
             )
-        query = query.where(Person.department_id == department_id)
-    else:
-        query = query.where(Person.department_id.in_(department_ids))
+        department_ids = await _department_scope(db, department_id)
 
-    # Execute query
-    result = await db.execute(query)
-    persons = result.scalars().all()
+    # Rank candidates by similarity
+    matches = await _match_persons(
+        db, search_embedding, department_ids, num_result, unit_id)
 
-    if not persons:
+    if not matches:
         return FaceSearchResponse(
             request_time=request_time,
             results=[],
@@ -552,64 +562,108 @@ async def search_face_camera(
             nearest_result=None
         )
 
-    # Calculate similarities for all persons
-    similarities = []
-    for person in persons:
-        if not person.feature:
-            continue
-
-        # Convert stored feature to numpy array and normalize
-        person_embedding = np.array(person.feature)
-        person_embedding = person_embedding / np.linalg.norm(person_embedding)
-
-        # Calculate cosine similarity
-        similarity = min(round(
-            float(np.dot(search_embedding, person_embedding)), 2) * 2, 1.0)
+    # Filter results by threshold and take top N results
+    top_results = [
+        match for match in matches if match.similarity >= adjusted_threshold
+    ][:num_result]
 
-        # Add to similarities list regardless of threshold
-        similarities.append((similarity, person))
+    return FaceSearchResponse(
+        request_time=request_time,
+        results=top_results,
+        data=[detect_result.data],
+        nearest_result=matches[0]
+    )
 
-    # Sort by similarity in descending order
-    similarities.sort(key=lambda x: x[0], reverse=True)
 
-    # Get nearest result (highest similarity) regardless of threshold
-    nearest_person = similarities[0] if similarities else None
-    nearest_result = None
-    if nearest_person:
-        similarity, person = nearest_person
-        nearest_result = FaceSearchResult(
-            person_id=person.id,
-            name=person.name,
-            code=person.code,
-            department_id=person.department_id,
-            type=person.type,
-            similarity=similarity,
-            image=person.image
+async def search_face_batch(
+    db: AsyncSession,
+    base64_images: list[str],
+    unit_id: int,
+    department_id: Optional[int] = None,
+    threshold: float = 0.6,
+    quality: float = 0.3,
+    num_result: int = 1
+) -> FaceSearchBatchResponse:
+    """Search several face images against one unit/department gallery
+
+    Departments are resolved once, all images are detected together and the
+    embeddings are scored in a single matrix-matrix product. Like
+    search_face_camera, no event images are saved. Images that fail
+    detection or quality checks get an `error` instead of failing the batch.
+    """
+    # Validate unit exists
+    unit = await get_unit_by_id(db, unit_id)
+    if not unit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unit does not exist"
         )
 
-    # Filter results by threshold
-    threshold_results = [(s, p)
-                         for s, p in similarities if s >= adjusted_threshold]
-    # Take top N results
-    top_results = threshold_results[:num_result]
-
-    # Convert to response format
-    search_results = [
-        FaceSearchResult(
-            person_id=person.id,
-            name=person.name,
-            code=person.code,
-            department_id=person.department_id,
-            type=person.type,
-            similarity=similarity,
-            image=person.image
+    # Get all departments in the unit
+    department_ids = await get_unit_department_ids(
+        db, unit_id, include_child_units=settings.SEARCH_INCLUDE_DESCENDANTS)
+    if not department_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No departments found in the unit"
         )
-        for similarity, person in top_results
-    ]
 
-    return FaceSearchResponse(
-        request_time=request_time,
-        results=search_results,
-        data=[detect_result.data],
-        nearest_result=nearest_result
-    )
+    # Filter by department_id if provided, otherwise use all departments in unit
+    if department_id:
+        if department_id not in department_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Department does not belong to the specified unit"
+            )
+        department_ids = await _department_scope(db, department_id)
+
+    # Call face detection API for all images
+    t = time.time()
+    detect_results = await detect_faces(base64_images)
+    request_time = time.time() - t
+
+    items: list[Optional[FaceSearchBatchItem]] = [None] * len(base64_images)
+    detected = []
+    for index, detect_result in enumerate(detect_results):
+        if isinstance(detect_result, HTTPException):
+            items[index] = FaceSearchBatchItem(
+                request_time=request_time,
+                error=str(detect_result.detail)
+            )
+        elif detect_result.data.quality < quality:
+            del detect_result.data.feature
+            items[index] = FaceSearchBatchItem(
+                request_time=request_time,
+                data=[detect_result.data],
+                error=f"Face image quality is too low: {detect_result.data.quality}"
+            )
+        else:
+            detected.append((index, detect_result))
+
+    if detected:
+        search_embeddings = np.stack([
+            normalize_embedding(detect_result.data.feature)
+            for _, detect_result in detected
+        ])
+        matches = await _match_persons_batch(
+            db, search_embeddings, department_ids, num_result, unit_id)
+
+        for (index, detect_result), candidates in zip(detected, matches):
+            # Adjust threshold if mask is detected
+            adjusted_threshold = threshold
+            if detect_result.data.wearmask:
+                adjusted_threshold = max(
+                    0.0, threshold - settings.MASK_THRESHOLD_SUB)
+            del detect_result.data.feature
+
+            items[index] = FaceSearchBatchItem(
+                request_time=request_time,
+                results=[
+                    match for match in candidates
+                    if match.similarity >= adjusted_threshold
+                ][:num_result],
+                data=[detect_result.data],
+                nearest_result=candidates[0] if candidates else None
+            )
+
+    return FaceSearchBatchResponse(request_time=request_time, items=items)
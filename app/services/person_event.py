@@ -1,20 +1,32 @@
-from typing import Optional
-from datetime import datetime
+from typing import Any, AsyncIterable, Dict, List, Optional
+from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
-from app.models import PersonEvent, Person, Camera
-from app.schemas.person_event import PersonEventCreate, PersonEvent as PersonEventSchema
+from app.models import PersonEvent, PersonEventId, Person, Camera
+from app.schemas.person_event import (
+    PersonEventCreate,
+    PersonEvent as PersonEventSchema,
+    PersonEventBulkResult,
+    PersonEventBulkResponse,
+)
 from app.schemas.common import PaginationResponse
 from fastapi import HTTPException, status
 from app.core.config import get_settings
 from .base import BasePaginationService
+from app.services.batching import (
+    count_statuses, existing_values, stream_batches, validate_batch
+)
 import uuid
 from app.services.person import get_person_by_id
 from app.services.camera import get_camera_by_id
-from sqlalchemy.exc import IntegrityError
+from app.services.attendance import record_attendance, rollup_attendance
+from sqlalchemy.exc import DataError, IntegrityError
+from app.core.logging.logging_config import setup_logging
 
 settings = get_settings()
+logger = setup_logging()
 
 # Create person event pagination service
 person_event_pagination = BasePaginationService[PersonEvent, PersonEventSchema](
@@ -24,8 +36,12 @@ person_event_pagination = BasePaginationService[PersonEvent, PersonEventSchema](
 
 
 async def get_person_event_by_id(db: AsyncSession, event_id: str) -> Optional[PersonEvent]:
+    # The ledger's access_time lets Postgres open only the event's partition
+    access_time = select(PersonEventId.access_time).where(
+        PersonEventId.event_id == event_id).scalar_subquery()
     query = select(PersonEvent).where(
         PersonEvent.event_id == event_id,
+        PersonEvent.access_time == access_time,
         PersonEvent.deleted_at.is_(None)
     ).options(
         selectinload(PersonEvent.person),
@@ -40,6 +56,9 @@ async def get_person_events(
     *,
     page: int = 1,
     page_size: int = 100,
+    after: Optional[str] = None,
+    with_total: bool = True,
+    fields: Optional[List[str]] = None,
     is_unknown: bool = False,
     person_id: Optional[str] = None,
     device_id: Optional[int] = None,
@@ -101,15 +120,18 @@ async def get_person_events(
     # Apply all conditions
     query = query.where(*conditions)
 
-    # Add ordering
-    query = query.order_by(desc(PersonEvent.access_time))
-
-    # Get paginated results
+    # Get paginated results, newest first; event_id breaks access_time ties
     result = await person_event_pagination.get_paginated(
         db,
         page=page,
         size=page_size,
-        query=query
+        query=query,
+        cursor_columns=[PersonEvent.access_time, PersonEvent.event_id],
+        after=after,
+        with_total=with_total,
+        fields=fields,
+        # Only the deleted_at condition: the table-wide estimate is a fair total
+        estimate_total=len(conditions) == 1
     )
 
     return result
@@ -120,7 +142,12 @@ async def create_person_event(db: AsyncSession, event_data: PersonEventCreate) -
         # Create event directly - let the database handle uniqueness
         event_dict = event_data.model_dump()
         event_dict['created_at'] = settings.datetime_now
+        event_dict['event_id'] = event_dict.get('event_id') or str(uuid.uuid4())
 
+        # Claim the id in the ledger; person_event alone only keeps
+        # (event_id, access_time) unique
+        await db.execute(insert(PersonEventId).values(
+            event_id=event_dict['event_id'], access_time=event_dict['access_time']))
         db_event = PersonEvent(**event_dict)
         db.add(db_event)
         await db.flush()  # This will raise an error if event_id exists
@@ -143,12 +170,15 @@ async def create_person_event(db: AsyncSession, event_data: PersonEventCreate) -
                     detail="Person does not exist"
                 )
 
+        if settings.ATTENDANCE_INCREMENTAL:
+            await record_attendance(db, [event_dict])
         await db.commit()
         return db_event
 
     except IntegrityError as e:
         await db.rollback()
-        if "uq_person_event_event_id" in str(e):
+        if any(name in str(e) for name in (
+                "person_event_id_pkey", "person_event_pkey", "uq_person_event_event_id")):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Event ID already exists"
@@ -156,12 +186,134 @@ async def create_person_event(db: AsyncSession, event_data: PersonEventCreate) -
         raise
 
 
+# asyncpg accepts at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32767
+
+
+async def _write_events(db: AsyncSession, rows: List[dict]) -> set:
+    """Claim ids and insert events in one transaction, return the claimed ids"""
+    # Ids already in the ledger are duplicates, whatever their access_time
+    claim = (
+        pg_insert(PersonEventId)
+        .values([{"event_id": row["event_id"], "access_time": row["access_time"]}
+                 for row in rows])
+        .on_conflict_do_nothing(index_elements=[PersonEventId.event_id])
+        .returning(PersonEventId.event_id)
+    )
+    inserted = set((await db.execute(claim)).scalars().all())
+    if inserted:
+        await db.execute(
+            pg_insert(PersonEvent)
+            .values([row for row in rows if row["event_id"] in inserted])
+            .on_conflict_do_nothing(
+                index_elements=[PersonEvent.event_id, PersonEvent.access_time])
+        )
+    if settings.ATTENDANCE_INCREMENTAL:
+        await record_attendance(db, [row for row in rows if row["event_id"] in inserted])
+    await db.commit()
+    return inserted
+
+
+async def _insert_event_batch(
+    db: AsyncSession,
+    batch: List[tuple],
+    seen_ids: set
+) -> List[PersonEventBulkResult]:
+    """Validate and insert one batch of (index, raw event) pairs"""
+    results: Dict[int, PersonEventBulkResult] = {}
+
+    def fail(index: int, event_id: Optional[str], error: str) -> None:
+        results[index] = PersonEventBulkResult(
+            index=index, event_id=event_id, status="failed", error=error)
+
+    pending: List[tuple] = []
+    for index, event in validate_batch(batch, PersonEventCreate, "event_id", fail):
+        event_id = event.event_id or str(uuid.uuid4())
+        if event_id in seen_ids:
+            results[index] = PersonEventBulkResult(
+                index=index, event_id=event_id, status="duplicate")
+            continue
+        seen_ids.add(event_id)
+        pending.append((index, event_id, event))
+
+    # Reference checks, one IN query each
+    devices = await existing_values(db, Camera.id, {e.device_id for _, _, e in pending})
+    persons = await existing_values(
+        db, Person.id, {e.person_id for _, _, e in pending if e.person_id})
+
+    now = settings.datetime_now
+    values = []
+    for index, event_id, event in pending:
+        if event.device_id not in devices:
+            fail(index, event_id, "Device does not exist")
+        elif event.person_id and event.person_id not in persons:
+            fail(index, event_id, "Person does not exist")
+        else:
+            values.append((index, {
+                **event.model_dump(), "event_id": event_id, "created_at": now}))
+
+    if values:
+        try:
+            inserted = await _write_events(db, [row for _, row in values])
+        except (DataError, IntegrityError) as e:
+            # One bad row rejects the whole statement; retry each event alone
+            # so only the offending ones fail
+            await db.rollback()
+            logger.warning(f"Event batch rejected, inserting one by one: {e.orig}")
+            inserted = set()
+            for index, row in values:
+                try:
+                    inserted |= await _write_events(db, [row])
+                except (DataError, IntegrityError) as e:
+                    await db.rollback()
+                    fail(index, row["event_id"], str(e.orig).splitlines()[0])
+        for index, row in values:
+            if index not in results:
+                results[index] = PersonEventBulkResult(
+                    index=index, event_id=row["event_id"],
+                    status="created" if row["event_id"] in inserted else "duplicate")
+
+    return [results[index] for index, _ in batch]
+
+
+async def create_person_events_bulk(
+    db: AsyncSession,
+    events: AsyncIterable[Any]
+) -> PersonEventBulkResponse:
+    """Insert a stream of events in batches
+
+    Each batch checks devices and persons with one IN query apiece. It then
+    claims its event ids in the person_event_id ledger with a single INSERT
+    ... ON CONFLICT (event_id) DO NOTHING and inserts only the claimed
+    events. A retried event_id comes back as "duplicate" instead of failing
+    the batch, even when its access_time differs. If the database still
+    rejects the batch, its events are retried one at a time and only the
+    rejected ones are reported as "failed".
+    """
+    columns = len(PersonEvent.__table__.columns)
+    batch_size = max(1, min(settings.EVENT_BULK_BATCH_SIZE, MAX_BIND_PARAMS // columns))
+
+    results: List[PersonEventBulkResult] = []
+    seen_ids: set = set()
+    async for batch in stream_batches(events, batch_size):
+        results.extend(await _insert_event_batch(db, batch, seen_ids))
+
+    counts = count_statuses(results, ("created", "duplicate", "failed"))
+    return PersonEventBulkResponse(total=len(results), results=results, **counts)
+
+
 async def delete_person_event(db: AsyncSession, event_id: str) -> bool:
     event = await get_person_event_by_id(db, event_id)
     if not event:
         return False
 
     event.deleted_at = settings.datetime_now
+    if event.person_id:
+        # Rebuild the person's day in the same transaction as the delete
+        await db.flush()
+        day = event.access_time.date()
+        await rollup_attendance(
+            db, day, day + timedelta(days=1), event.person_id, commit=False)
     await db.commit()
     return True
 
@@ -0,0 +1,160 @@
+import asyncio
+import uuid
+from typing import Any, AsyncIterable, Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+from app.models import Department, Person, PersonType
+from app.schemas.person import PersonCreate, PersonImportResult, PersonImportResponse
+from app.services.ai import detect_faces
+from app.services.batching import (
+    count_statuses, existing_values, stream_batches, validate_batch
+)
+from app.services.face_gallery import upsert_delta
+from app.services.face_gallery_sync import publish_gallery_delta
+from app.services.face_vector import (
+    check_vector_dimension, is_pgvector_available, sync_person_vectors
+)
+from app.utils.helpers import save_base64_image
+
+settings = get_settings()
+logger = setup_logging()
+
+
+async def _detect(images: List[str]) -> list:
+    """Detect faces in waves of PERSON_IMPORT_CONCURRENCY images"""
+    size = max(1, settings.PERSON_IMPORT_CONCURRENCY)
+    results = []
+    for start in range(0, len(images), size):
+        results.extend(await detect_faces(images[start:start + size]))
+    return results
+
+
+async def _save_images(items: List[tuple]) -> List[Optional[str]]:
+    """Write (person_id, base64_image) pairs with bounded parallelism"""
+    semaphore = asyncio.Semaphore(max(1, settings.PERSON_IMPORT_CONCURRENCY))
+
+    async def save(person_id: str, base64_image: str) -> Optional[str]:
+        async with semaphore:
+            return await save_base64_image(
+                base64_image, settings.get_person_path, filename=person_id + ".jpg")
+
+    return await asyncio.gather(*[save(*item) for item in items])
+
+
+async def _import_batch(
+    db: AsyncSession,
+    batch: List[tuple],
+    seen_codes: set
+) -> List[PersonImportResult]:
+    """Validate, detect and insert one batch of (row number, raw row) pairs"""
+    results: Dict[int, PersonImportResult] = {}
+    pending: List[tuple] = []
+
+    def fail(row: int, code: Optional[str], error: str) -> None:
+        results[row] = PersonImportResult(row=row, code=code, status="failed", error=error)
+
+    for row, person in validate_batch(batch, PersonCreate, "code", fail):
+        if not person.base64_image:
+            fail(row, person.code, "Image is required")
+            continue
+        if person.code in seen_codes:
+            fail(row, person.code, "Duplicate code in import")
+            continue
+        seen_codes.add(person.code)
+        pending.append((row, person))
+
+    # Reference checks, one IN query each
+    departments = await existing_values(
+        db, Department.id, {p.department_id for _, p in pending})
+    person_types = await existing_values(
+        db, PersonType.id, {p.type for _, p in pending if p.type})
+    taken_codes = await existing_values(db, Person.code, {p.code for _, p in pending})
+
+    checked = []
+    for row, person in pending:
+        if person.department_id not in departments:
+            fail(row, person.code, "Department does not exist")
+        elif person.type not in person_types:
+            fail(row, person.code, "Person type does not exist")
+        elif person.code in taken_codes:
+            fail(row, person.code, "Person code already exists")
+        else:
+            checked.append((row, person))
+
+    detections = await _detect([person.base64_image for _, person in checked])
+    mirror_vectors = await is_pgvector_available(db)
+    detected = []
+    for (row, person), detect_result in zip(checked, detections):
+        if isinstance(detect_result, HTTPException):
+            fail(row, person.code, str(detect_result.detail))
+        elif detect_result.data.quality < settings.REGISTER_MIN_QUALITY:
+            fail(row, person.code,
+                 f"Face image quality is too low: {detect_result.data.quality}. "
+                 f"Minimum required: {settings.REGISTER_MIN_QUALITY}")
+        elif mirror_vectors and check_vector_dimension(detect_result.data.feature):
+            fail(row, person.code, check_vector_dimension(detect_result.data.feature))
+        else:
+            detected.append((row, person, str(uuid.uuid4()), detect_result.data.feature))
+
+    # Images are only written for rows that will be inserted
+    image_names = await _save_images([
+        (person_id, person.base64_image) for _, person, person_id, _ in detected
+    ])
+
+    now = settings.datetime_now
+    values = []
+    for (row, person, person_id, feature), image_name in zip(detected, image_names):
+        if not image_name:
+            fail(row, person.code, "Failed to save image")
+            continue
+        person_dict = person.model_dump(exclude={"base64_image"})
+        person_dict.update(id=person_id, image=image_name, feature=feature, created_at=now)
+        values.append((row, person_dict))
+
+    if values:
+        try:
+            await db.execute(insert(Person), [person_dict for _, person_dict in values])
+            await sync_person_vectors(db, [(d["id"], d["feature"]) for _, d in values])
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            logger.warning(f"Person import batch rejected: {str(e)}")
+            for row, person_dict in values:
+                fail(row, person_dict["code"], "Batch insert failed, retry the row")
+            values = []
+
+    if values:
+        for row, person_dict in values:
+            await publish_gallery_delta(upsert_delta(Person(**person_dict)))
+            results[row] = PersonImportResult(
+                row=row, code=person_dict["code"], id=person_dict["id"], status="created")
+
+    return [results[row] for row, _ in batch]
+
+
+async def import_persons(
+    db: AsyncSession,
+    rows: AsyncIterable[Any]
+) -> PersonImportResponse:
+    """Create persons from a stream of PersonCreate-shaped rows
+
+    Rows are processed in batches of PERSON_IMPORT_BATCH_SIZE: references and
+    codes are checked with one query per batch, faces are detected and images
+    written with bounded concurrency, and valid rows are inserted with a
+    single executemany and commit. A bad row never fails its neighbours.
+    """
+    results: List[PersonImportResult] = []
+    seen_codes: set = set()
+    async for batch in stream_batches(rows, settings.PERSON_IMPORT_BATCH_SIZE, start=1):
+        results.extend(await _import_batch(db, batch, seen_codes))
+
+    counts = count_statuses(results, ("created", "failed"))
+    return PersonImportResponse(
+        total=len(results),
+        results=results,
+        **counts
+    )
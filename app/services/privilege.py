@@ -6,6 +6,7 @@ from app.schemas.privilege import PrivilegeCreate, PrivilegeUpdate, Privilege as
 from app.schemas.common import PaginationResponse
 from app.core.config import get_settings
 from .base import BasePaginationService
+from .privilege_cache import invalidate_privileges
 
 settings = get_settings()
 
@@ -74,6 +75,7 @@ async def update_privilege(
 
     await db.commit()
     await db.refresh(privilege)
+    await invalidate_privileges()
     return privilege
 
 
@@ -88,6 +90,7 @@ async def delete_privilege(
 
     privilege.deleted_at = settings.datetime_now
     await db.commit()
+    await invalidate_privileges()
     return True
 
 
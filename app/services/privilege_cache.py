@@ -0,0 +1,95 @@
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Privilege, Role, role_privilege, user_role
+from app.core.config import get_settings
+from app.core.logging.logging_config import setup_logging
+from app.core.redis import get_redis
+
+settings = get_settings()
+logger = setup_logging()
+
+# Bumped on every role/privilege write; entries stamped with an older version
+# are stale. With PRIVILEGE_CACHE_REDIS_ENABLED the version lives in Redis so a
+# write on one worker reaches the others.
+_version = 0
+# user id -> (version, loaded_at, privilege names)
+_cache: Dict[int, Tuple[int, float, FrozenSet[str]]] = {}
+
+
+def is_cache_enabled() -> bool:
+    """Caching needs the shared version when several workers serve requests
+
+    Without it a role or privilege change would only reach the worker that
+    made it, and the others would keep granting the old privileges.
+    """
+    return settings.PRIVILEGE_CACHE_REDIS_ENABLED or settings.APP_WORKERS <= 1
+
+
+async def _current_version() -> Optional[int]:
+    """Version entries must carry to be fresh, None if it cannot be read"""
+    if not settings.PRIVILEGE_CACHE_REDIS_ENABLED:
+        return _version
+    try:
+        return int(await get_redis().get(settings.PRIVILEGE_VERSION_KEY) or 0)
+    except RedisError as e:
+        logger.warning(f"Privilege cache version read failed: {str(e)}")
+        return None
+
+
+async def invalidate_privileges() -> None:
+    """Drop cached privilege sets after a user-role, role or privilege write"""
+    global _version
+    _version += 1
+    _cache.clear()
+    if not settings.PRIVILEGE_CACHE_REDIS_ENABLED:
+        return
+    try:
+        await get_redis().incr(settings.PRIVILEGE_VERSION_KEY)
+    except RedisError as e:
+        logger.warning(f"Privilege cache invalidation not shared: {str(e)}")
+
+
+def _is_fresh(entry: Tuple[int, float, FrozenSet[str]], version: int) -> bool:
+    entry_version, loaded_at, _ = entry
+    return entry_version == version and \
+        time.monotonic() - loaded_at < settings.PRIVILEGE_CACHE_TTL
+
+
+async def _load(db: AsyncSession, user_id: int) -> FrozenSet[str]:
+    query = (
+        select(Privilege.name)
+        .join(role_privilege, role_privilege.c.privilege_id == Privilege.id)
+        .join(Role, Role.id == role_privilege.c.role_id)
+        .join(user_role, user_role.c.role_id == Role.id)
+        .where(
+            user_role.c.user_id == user_id,
+            Role.deleted_at.is_(None),
+            Privilege.deleted_at.is_(None)
+        )
+        .distinct()
+    )
+    result = await db.execute(query)
+    return frozenset(result.scalars().all())
+
+
+async def get_user_privilege_set(db: AsyncSession, user_id: int) -> FrozenSet[str]:
+    """Privilege names granted to a user through live roles, cached per user"""
+    if not is_cache_enabled():
+        return await _load(db, user_id)
+    # Read on every lookup; the cache is bypassed while it cannot be checked
+    version = await _current_version()
+    if version is None:
+        return await _load(db, user_id)
+
+    entry = _cache.get(user_id)
+    if entry and _is_fresh(entry, version):
+        return entry[2]
+
+    # Stamped with the version seen before loading, so a concurrent write
+    # makes the entry stale on the next lookup
+    privileges = await _load(db, user_id)
+    _cache[user_id] = (version, time.monotonic(), privileges)
+    return privileges
@@ -8,6 +8,7 @@ from app.schemas.common import PaginationResponse
 from app.core.config import get_settings
 from datetime import datetime
 from .base import BasePaginationService
+from .privilege_cache import invalidate_privileges
 
 settings = get_settings()
 
@@ -86,6 +87,7 @@ async def update_role(
 
     await db.commit()
     await db.refresh(role)
+    await invalidate_privileges()
     return role
 
 
@@ -96,6 +98,7 @@ async def delete_role(db: AsyncSession, role_id: int) -> bool:
 
     role.deleted_at = settings.datetime_now
     await db.commit()
+    await invalidate_privileges()
     return True
 
 
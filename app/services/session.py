@@ -1,10 +1,13 @@
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, or_
 from app.models import Session
 from app.schemas.session import SessionCreate
 from datetime import datetime, timezone, timedelta
 from app.core.config import get_settings
+from app.core.security.token_utils import hash_token
+from app.core.security.session_cache import evict_sessions, evict_user_sessions
+from app.core.security.session_denylist import deny_sessions
 
 settings = get_settings()
 
@@ -24,14 +27,32 @@ async def create_session(
     return db_session
 
 
-async def get_session_by_access_token(
+async def open_session(
     db: AsyncSession,
-    access_token: str
+    user_id: int,
+    expires_at: datetime,
+    refresh_expires_at: datetime
+) -> Session:
+    """Insert a session without tokens and flush it so its id can go into the claims"""
+    db_session = Session(
+        user_id=user_id,
+        expires_at=expires_at,
+        refresh_expires_at=refresh_expires_at,
+        created_at=settings.datetime_now
+    )
+    db.add(db_session)
+    await db.flush()
+    return db_session
+
+
+async def get_session_by_access_token_hash(
+    db: AsyncSession,
+    access_token_hash: str
 ) -> Optional[Session]:
     query = (
         select(Session)
         .where(
-            Session.access_token == access_token,
+            Session.access_token_hash == access_token_hash,
             Session.deleted_at.is_(None),
             Session.expires_at > settings.datetime_now
         )
@@ -41,6 +62,13 @@ async def get_session_by_access_token(
     return result.scalar_one_or_none()
 
 
+async def get_session_by_access_token(
+    db: AsyncSession,
+    access_token: str
+) -> Optional[Session]:
+    return await get_session_by_access_token_hash(db, hash_token(access_token))
+
+
 async def get_session_by_refresh_token(
     db: AsyncSession,
     refresh_token: str
@@ -48,7 +76,7 @@ async def get_session_by_refresh_token(
     query = (
         select(Session)
         .where(
-            Session.refresh_token == refresh_token,
+            Session.refresh_token_hash == hash_token(refresh_token),
             Session.deleted_at.is_(None),
             Session.refresh_expires_at > settings.datetime_now
         )
@@ -74,6 +102,8 @@ async def invalidate_session(
     if session:
         session.deleted_at = settings.datetime_now
         await db.commit()
+        await evict_sessions([session.access_token_hash])
+        await deny_sessions([(session.id, session.expires_at)])
 
 
 async def invalidate_all_user_sessions(
@@ -96,6 +126,9 @@ async def invalidate_all_user_sessions(
         session.deleted_at = now
 
     await db.commit()
+    await evict_sessions(session.access_token_hash for session in sessions)
+    await evict_user_sessions(user_id)
+    await deny_sessions((session.id, session.expires_at) for session in sessions)
 
 
 async def get_session_by_token(
@@ -104,7 +137,7 @@ async def get_session_by_token(
 ) -> Optional[Session]:
     """Get session by access token"""
     query = select(Session).where(
-        Session.access_token == token,
+        Session.access_token_hash == hash_token(token),
         Session.deleted_at.is_(None)
     )
     result = await db.execute(query)
@@ -120,6 +153,37 @@ async def cleanup_expired_refresh_tokens(db: AsyncSession) -> int:
     return result.rowcount
 
 
+async def compact_sessions(
+    db: AsyncSession,
+    batch_size: int = 1000,
+    max_batches: int = 100
+) -> int:
+    """Hard delete soft-deleted and refresh-expired sessions in short batches"""
+    cutoff = settings.datetime_now - timedelta(days=settings.SESSION_RETENTION_DAYS)
+    batch = (
+        select(Session.id)
+        .where(or_(
+            Session.deleted_at < cutoff,
+            Session.refresh_expires_at < cutoff
+        ))
+        .order_by(Session.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    query = delete(Session).where(Session.id.in_(batch))
+
+    removed = 0
+    for _ in range(max_batches):
+        result = await db.execute(query)
+        # Commit per batch so row locks are held only for one batch
+        await db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    return removed
+
+
 async def get_session_by_id(db: AsyncSession, session_id: int) -> Optional[Session]:
     query = select(Session).where(
         Session.id == session_id,
@@ -148,6 +212,8 @@ async def delete_session(db: AsyncSession, session_id: int) -> bool:
 
     session.deleted_at = settings.datetime_now
     await db.commit()
+    await evict_sessions([session.access_token_hash])
+    await deny_sessions([(session.id, session.expires_at)])
     return True
 
 
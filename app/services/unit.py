@@ -7,6 +7,7 @@ from app.schemas.common import PaginationResponse
 from fastapi import HTTPException, status
 from app.core.config import get_settings
 from .base import BasePaginationService
+from .department_tree import invalidate_department_tree
 
 settings = get_settings()
 
@@ -83,6 +84,7 @@ async def create_unit(
     db.add(db_unit)
     await db.commit()
     await db.refresh(db_unit)
+    invalidate_department_tree()
     return db_unit
 
 
@@ -156,6 +158,7 @@ async def update_unit(
 
     await db.commit()
     await db.refresh(unit)
+    invalidate_department_tree()
     return unit
 
 
@@ -170,4 +173,5 @@ async def delete_unit(
 
     unit.deleted_at = settings.datetime_now
     await db.commit()
+    invalidate_department_tree()
     return True
@@ -6,6 +6,9 @@ from app.models import User
 from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
 from app.schemas.common import PaginationResponse
 from app.core.security import get_password_hash
+from app.core.security.session_cache import evict_user_sessions
+from app.services.session import invalidate_all_user_sessions
+from app.services.privilege_cache import invalidate_privileges
 from app.core.config import get_settings
 from .base import BasePaginationService
 from fastapi import HTTPException, status
@@ -132,11 +135,15 @@ async def update_user(
                     detail="Invalid unit_id: Unit is inactive"
                 )
 
+    # Stateless tokens carry no user state, so these changes revoke them
+    revoke_sessions = "password" in update_data or update_data.get("status") is False
+
     if "password" in update_data:
         update_data["password_hash"] = get_password_hash(
             update_data.pop("password"))
 
-    if "roles" in update_data:
+    roles_changed = "roles" in update_data
+    if roles_changed:
         query = select(Role).where(
             Role.id.in_(update_data.pop("roles")),
             Role.deleted_at.is_(None)
@@ -150,6 +157,12 @@ async def update_user(
 
     await db.commit()
     await db.refresh(user)
+    await evict_user_sessions(user.id)
+    if revoke_sessions:
+        await invalidate_all_user_sessions(db, user.id)
+        await db.refresh(user)
+    if roles_changed:
+        await invalidate_privileges()
     return user
 
 
@@ -184,4 +197,7 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
         return False
     user.deleted_at = settings.datetime_now
     await db.commit()
+    await evict_user_sessions(user_id)
+    # Stateless tokens carry no user state, so revoke them explicitly
+    await invalidate_all_user_sessions(db, user_id)
     return True
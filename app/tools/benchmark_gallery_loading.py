@@ -0,0 +1,124 @@
+import sys
+from pathlib import Path
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent.parent)
+sys.path.append(project_root)
+
+import argparse
+import asyncio
+import time
+import uuid
+import numpy as np
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.models import Department, Person, PersonType, Unit
+from app.services.face_gallery import load_gallery_rows
+
+settings = get_settings()
+
+INSERT_CHUNK_SIZE = 5000
+
+
+async def seed_persons(db: AsyncSession, count: int, dimension: int) -> int:
+    """Insert synthetic persons into a scratch department, return its id"""
+    unit = (await db.execute(select(Unit).limit(1))).scalar_one_or_none()
+    person_type = (await db.execute(select(PersonType).limit(1))).scalar_one_or_none()
+    if not unit or not person_type:
+        raise RuntimeError("Need at least one unit and one person type to benchmark")
+
+    department = Department(
+        name="benchmark", code=f"bench-{uuid.uuid4().hex[:8]}",
+        unit_id=unit.id, created_at=settings.datetime_now)
+    db.add(department)
+    await db.flush()
+
+    rng = np.random.default_rng(0)
+    now = settings.datetime_now
+    for start in range(0, count, INSERT_CHUNK_SIZE):
+        size = min(INSERT_CHUNK_SIZE, count - start)
+        features = rng.normal(size=(size, dimension)).astype(np.float32)
+        await db.execute(insert(Person), [
+            {
+                "id": str(uuid.uuid4()),
+                "department_id": department.id,
+                "name": f"Benchmark {start + i}",
+                "code": f"bench{start + i}",
+                "image": "benchmark.jpg",
+                "feature": features[i],
+                "type": person_type.id,
+                "created_at": now,
+            }
+            for i in range(size)
+        ])
+    return department.id
+
+
+async def load_entities(db: AsyncSession, department_id: int) -> int:
+    """The select(Person) path used before column projection"""
+    query = (
+        select(Person)
+        .join(Person.department)
+        .where(
+            Person.deleted_at.is_(None),
+            Person.feature.isnot(None),
+            Person.department_id.in_([department_id])
+        )
+    )
+    result = await db.execute(query)
+    persons = result.scalars().all()
+    np.asarray([person.feature for person in persons], dtype=np.float32)
+    db.expunge_all()
+    return len(persons)
+
+
+async def load_projected(db: AsyncSession, department_id: int) -> int:
+    rows = await load_gallery_rows(db, [department_id])
+    np.asarray([row.feature for row in rows], dtype=np.float32)
+    return len(rows)
+
+
+async def best_time(loader, db, department_id: int, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        count = await loader(db, department_id)
+        timings.append(time.perf_counter() - t)
+    return count, min(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare select(Person) against column-projected gallery loading")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dimension", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("\nGallery loading benchmark (synthetic rows, rolled back afterwards)")
+    print("=" * 66)
+    print(f"{'persons':>10}{'path':>14}{'seconds':>12}{'rows/sec':>16}{'speedup':>12}")
+    print("-" * 66)
+
+    for size in args.sizes:
+        async with async_session() as db:
+            try:
+                department_id = await seed_persons(db, size, args.dimension)
+                _, entity_time = await best_time(
+                    load_entities, db, department_id, args.repeat)
+                count, projected_time = await best_time(
+                    load_projected, db, department_id, args.repeat)
+            finally:
+                await db.rollback()
+
+        print(f"{count:>10}{'select(Person)':>14}{entity_time:>12.3f}"
+              f"{count / entity_time:>16,.0f}{1.0:>12.2f}")
+        print(f"{count:>10}{'projected':>14}{projected_time:>12.3f}"
+              f"{count / projected_time:>16,.0f}{entity_time / projected_time:>12.2f}")
+
+    print("=" * 66)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent.parent)
+sys.path.append(project_root)
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+import numpy as np
+from sqlalchemy import select, desc
+from app.core.database import async_session
+from app.models import PersonEvent
+from app.services.department_tree import get_unit_department_ids
+from app.services.face_gallery import FaceGallery, normalize_rows
+
+
+async def load_queries(db, count: int) -> List[list]:
+    """Use recent event embeddings as realistic probe faces"""
+    query = (
+        select(PersonEvent.feature)
+        .where(PersonEvent.feature.isnot(None))
+        .order_by(desc(PersonEvent.access_time))
+        .limit(count)
+    )
+    result = await db.execute(query)
+    return [
+        feature for feature in result.scalars().all()
+        if feature is not None and len(feature)
+    ]
+
+
+def noisy_gallery_queries(gallery: FaceGallery, count: int, seed: int = 0) -> np.ndarray:
+    """Fallback probes: gallery rows with added noise"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(gallery.embeddings.shape[0], count)
+    noise = rng.normal(scale=0.02, size=(count, gallery.dimension)).astype(np.float32)
+    return normalize_rows(gallery.embeddings[rows] + noise)
+
+
+def measure(gallery, queries, department_ids, top_k, nprobe: Optional[int]):
+    latencies = []
+    results = []
+    for embedding in queries:
+        t = time.perf_counter()
+        matches = gallery.search(embedding, department_ids, top_k, nprobe=nprobe)
+        latencies.append((time.perf_counter() - t) * 1000)
+        results.append([record[0] for _, record in matches])
+    return results, np.array(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare IVF face search against exact search")
+    parser.add_argument("--unit-id", type=int, help="Restrict searches to a unit")
+    parser.add_argument("--nlist", type=int, default=0,
+                        help="Coarse centroids, 0 = sqrt(gallery size)")
+    parser.add_argument("--nprobe", type=int, nargs="+",
+                        default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--top-k", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    gallery = FaceGallery()
+    async with async_session() as db:
+        await gallery.load(db)
+        features = await load_queries(db, args.queries)
+        if args.unit_id is not None:
+            department_ids = await get_unit_department_ids(db, args.unit_id)
+        else:
+            department_ids = np.unique(gallery.department_ids).tolist()
+
+    if not len(gallery):
+        print("Gallery is empty")
+        return
+
+    features = [f for f in features if len(f) == gallery.dimension]
+    if features:
+        queries = normalize_rows(np.asarray(features, dtype=np.float32))
+    else:
+        queries = noisy_gallery_queries(gallery, args.queries)
+
+    t = time.perf_counter()
+    gallery.build_index(args.nlist or None)
+    build_time = time.perf_counter() - t
+
+    print(f"\nGallery: {len(gallery)} persons, dimension {gallery.dimension}")
+    print(f"Queries: {len(queries)} ({'events' if features else 'noisy gallery rows'})")
+    print(f"Index: nlist={gallery.index.nlist}, built in {build_time:.2f}s")
+    print("=" * 62)
+
+    exact, exact_latency = measure(
+        gallery, queries, department_ids, args.top_k, None)
+    print(f"{'mode':<12}{'recall@' + str(args.top_k):>12}"
+          f"{'mean ms':>12}{'p95 ms':>12}{'speedup':>12}")
+    print("-" * 62)
+    print(f"{'exact':<12}{1.0:>12.4f}{exact_latency.mean():>12.3f}"
+          f"{np.percentile(exact_latency, 95):>12.3f}{1.0:>12.2f}")
+
+    for nprobe in args.nprobe:
+        approx, latency = measure(
+            gallery, queries, department_ids, args.top_k, nprobe)
+        hits = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+        total = sum(len(e) for e in exact) or 1
+        print(f"{'ivf/' + str(nprobe):<12}{hits / total:>12.4f}{latency.mean():>12.3f}"
+              f"{np.percentile(latency, 95):>12.3f}"
+              f"{exact_latency.mean() / latency.mean():>12.2f}")
+
+    print("=" * 62)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
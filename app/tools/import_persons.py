@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+# Add the project root directory to Python path
+project_root = str(Path(__file__).parent.parent.parent)
+sys.path.append(project_root)
+
+import argparse
+import asyncio
+import base64
+import csv
+import io
+import time
+import zipfile
+from typing import AsyncIterator, Callable, Iterator, Optional
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.redis import close_redis
+from app.services.ai import close_ai_client
+from app.services.person_import import import_persons
+
+# CSV columns copied onto PersonCreate; "image" names the photo file
+CSV_FIELDS = ["name", "code", "department_id", "type", "gender", "birthday",
+              "identity_card", "phone", "email"]
+
+
+def parse_bool(value: str) -> Optional[bool]:
+    value = value.strip().lower()
+    if not value:
+        return None
+    return value in ("1", "true", "yes", "male", "m")
+
+
+def csv_rows(text: str, read_image: Callable[[str], bytes]) -> Iterator[dict]:
+    """Turn CSV records into PersonCreate-shaped rows with base64 images"""
+    for record in csv.DictReader(io.StringIO(text)):
+        row = {field: record[field].strip() or None
+               for field in CSV_FIELDS if field in record}
+        if row.get("gender") is not None:
+            row["gender"] = parse_bool(row["gender"])
+        image = (record.get("image") or "").strip()
+        try:
+            row["base64_image"] = base64.b64encode(read_image(image)).decode() if image else ""
+        except (OSError, KeyError):
+            row["base64_image"] = ""
+        yield row
+
+
+def open_source(path: Path, csv_name: str) -> Iterator[dict]:
+    """Read persons from a CSV next to its images, or a ZIP holding both"""
+    if path.suffix.lower() == ".zip":
+        archive = zipfile.ZipFile(path)
+        text = archive.read(csv_name).decode("utf-8-sig")
+        return csv_rows(text, archive.read)
+    text = path.read_text(encoding="utf-8-sig")
+    return csv_rows(text, lambda name: (path.parent / name).read_bytes())
+
+
+async def aiter_rows(rows: Iterator[dict]) -> AsyncIterator[dict]:
+    for row in rows:
+        yield row
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk import persons from a CSV (images beside it) or a ZIP")
+    parser.add_argument("source", type=Path, help="persons.csv or an archive.zip")
+    parser.add_argument("--csv-name", default="persons.csv",
+                        help="CSV file name inside the ZIP")
+    parser.add_argument("--report", type=Path, help="Write per-row results as CSV")
+    args = parser.parse_args()
+    # Without gallery sync the new faces would only reach this process's
+    # gallery, never the API workers'
+    if not get_settings().FACE_GALLERY_SYNC_ENABLED:
+        parser.error("FACE_GALLERY_SYNC_ENABLED must be true so the API workers "
+                     "pick up imported faces")
+
+    started = time.perf_counter()
+    try:
+        async with async_session() as db:
+            response = await import_persons(db, aiter_rows(open_source(args.source, args.csv_name)))
+    finally:
+        await close_ai_client()
+        await close_redis()
+    elapsed = time.perf_counter() - started
+
+    print(f"\nImported {response.created}/{response.total} persons "
+          f"({response.failed} failed) in {elapsed:.1f}s")
+    for result in response.results:
+        if result.status == "failed":
+            print(f"  row {result.row} ({result.code}): {result.error}")
+
+    if args.report:
+        with args.report.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["row", "code", "id", "status", "error"])
+            for result in response.results:
+                writer.writerow([result.row, result.code, result.id,
+                                 result.status, result.error])
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
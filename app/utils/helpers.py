@@ -1,9 +1,11 @@
 import base64
+import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from uuid import uuid4
 import aiofiles
+from fastapi import HTTPException, Request, status
 
 
 async def save_base64_image(base64_string: str, save_path: str, filename: str = str(uuid4()) + ".jpg") -> Optional[str]:
@@ -68,3 +70,45 @@ def save_base64_image_sync(base64_image: str, path: str, filename: str = None) -
     except Exception as e:
         print(f"Error saving image: {str(e)}")
         return None
+
+
+async def iter_json_rows(request: Request) -> AsyncIterator[Any]:
+    """Yield rows from a JSON array body or an NDJSON stream
+
+    A JSON array is read whole; anything else is parsed line by line as the
+    body streams in. Lines that are not valid JSON are yielded as the raw
+    string so the caller can report them per row.
+    """
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            rows = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body is not valid JSON"
+            )
+        if not isinstance(rows, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array"
+            )
+        for row in rows:
+            yield row
+        return
+
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_json_line(line)
+    if buffer.strip():
+        yield _parse_json_line(buffer)
+
+
+def _parse_json_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", errors="replace")
@@ -0,0 +1,44 @@
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to the standard json module
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # NumPy arrays and scalars
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that skips FastAPI's response_model re-validation
+
+    Uses orjson (with native NumPy support) when installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            content = content.model_dump()
+        if orjson is not None:
+            return orjson.dumps(
+                content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated `fields` query parameter"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
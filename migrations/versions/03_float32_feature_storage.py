@@ -0,0 +1,78 @@
+"""float32_feature_storage
+
+Revision ID: 03_float32_feature_storage
+Revises: 02_create_default_data
+Create Date: 2024-06-01 00:00:00.000000
+
+Store person and event embeddings as bytea of little-endian float32
+instead of float8[]. Existing vectors are converted in batches.
+"""
+from alembic import op
+import sqlalchemy as sa
+import numpy as np
+
+# revision identifiers, used by Alembic.
+revision = '03_float32_feature_storage'
+down_revision = '02_create_default_data'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+FLOAT32_LE = np.dtype("<f4")
+
+# (table, primary key column, feature is NOT NULL)
+FEATURE_TABLES = [
+    ('person', 'id', True),
+    ('person_event', 'event_id', False),
+]
+
+
+def _convert(table: str, key: str, source: str, target: str, encode) -> None:
+    """Copy `source` into `target` row by row in keyset-paginated batches"""
+    conn = op.get_bind()
+    select_batch = sa.text(
+        f"SELECT {key}, {source} FROM {table} "
+        f"WHERE {source} IS NOT NULL AND {key} > :last "
+        f"ORDER BY {key} LIMIT :limit"
+    )
+    update_row = sa.text(
+        f"UPDATE {table} SET {target} = :value WHERE {key} = :key")
+
+    last = ''
+    while True:
+        rows = conn.execute(
+            select_batch, {"last": last, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        conn.execute(update_row, [
+            {"key": row[0], "value": encode(row[1])} for row in rows
+        ])
+        last = rows[-1][0]
+
+
+def upgrade() -> None:
+    for table, key, required in FEATURE_TABLES:
+        op.add_column(table, sa.Column('feature_f32', sa.LargeBinary()))
+        _convert(
+            table, key, 'feature', 'feature_f32',
+            lambda value: np.asarray(value, dtype=FLOAT32_LE).tobytes()
+        )
+        op.drop_column(table, 'feature')
+        op.alter_column(table, 'feature_f32', new_column_name='feature')
+        # The copy column was added nullable; restore the original constraint
+        if required:
+            op.alter_column(table, 'feature', nullable=False)
+
+
+def downgrade() -> None:
+    for table, key, required in FEATURE_TABLES:
+        op.add_column(table, sa.Column(
+            'feature_f8', sa.ARRAY(sa.Float(), dimensions=1)))
+        _convert(
+            table, key, 'feature', 'feature_f8',
+            lambda value: np.frombuffer(value, dtype=FLOAT32_LE).tolist()
+        )
+        op.drop_column(table, 'feature')
+        op.alter_column(table, 'feature_f8', new_column_name='feature')
+        if required:
+            op.alter_column(table, 'feature', nullable=False)
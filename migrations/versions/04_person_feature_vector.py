@@ -0,0 +1,77 @@
+"""person_feature_vector
+
+Revision ID: 04_person_feature_vector
+Revises: 03_float32_feature_storage
+Create Date: 2024-06-15 00:00:00.000000
+
+Mirror person.feature into a pgvector column with an HNSW cosine index so
+face search can run in Postgres. Skipped when the server does not ship the
+vector extension; the API then keeps using in-process search.
+"""
+from alembic import op
+import sqlalchemy as sa
+import numpy as np
+
+# revision identifiers, used by Alembic.
+revision = '04_person_feature_vector'
+down_revision = '03_float32_feature_storage'
+branch_labels = None
+depends_on = None
+
+DIMENSION = 512
+BATCH_SIZE = 1000
+FLOAT32_LE = np.dtype("<f4")
+
+
+def _has_vector_extension() -> bool:
+    conn = op.get_bind()
+    return bool(conn.scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'vector')")))
+
+
+def _backfill() -> None:
+    conn = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, feature FROM person "
+        "WHERE feature IS NOT NULL AND id > :last ORDER BY id LIMIT :limit")
+    update_row = sa.text(
+        "UPDATE person SET feature_vec = CAST(CAST(:value AS text) AS vector) "
+        "WHERE id = :key")
+
+    last = ''
+    while True:
+        rows = conn.execute(
+            select_batch, {"last": last, "limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        batch = []
+        for key, feature in rows:
+            vector = np.frombuffer(feature, dtype=FLOAT32_LE)
+            if vector.size != DIMENSION:
+                continue
+            batch.append({
+                "key": key,
+                "value": "[" + ",".join(f"{v:.7g}" for v in vector) + "]"
+            })
+        if batch:
+            conn.execute(update_row, batch)
+        last = rows[-1][0]
+
+
+def upgrade() -> None:
+    if not _has_vector_extension():
+        print("pgvector extension not available, skipping feature_vec column")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(f"ALTER TABLE person ADD COLUMN IF NOT EXISTS feature_vec vector({DIMENSION})")
+    _backfill()
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_person_feature_vec ON person "
+        "USING hnsw (feature_vec vector_cosine_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_person_feature_vec")
+    op.execute("ALTER TABLE person DROP COLUMN IF EXISTS feature_vec")
@@ -0,0 +1,58 @@
+"""hashed_session_tokens
+
+Revision ID: 05_hashed_session_tokens
+Revises: 04_person_feature_vector
+Create Date: 2024-07-01 00:00:00.000000
+
+Replace the raw session.access_token/refresh_token columns with SHA-256 hex
+digests under unique B-tree indexes so token lookups stop scanning the table.
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# revision identifiers, used by Alembic.
+revision = '05_hashed_session_tokens'
+down_revision = '04_person_feature_vector'
+branch_labels = None
+depends_on = None
+
+# (raw token column, digest column)
+TOKEN_COLUMNS = [
+    ('access_token', 'access_token_hash'),
+    ('refresh_token', 'refresh_token_hash'),
+]
+
+
+def upgrade() -> None:
+    now = settings.datetime_now
+    for raw, digest in TOKEN_COLUMNS:
+        op.add_column('session', sa.Column(digest, sa.String(64)))
+        op.execute(
+            f"UPDATE session SET {digest} = "
+            f"encode(sha256(convert_to({raw}, 'UTF8')), 'hex')"
+        )
+        # Tokens issued in the same second used to be identical; keep the newest
+        op.get_bind().execute(sa.text(
+            f"UPDATE session s SET {digest} = NULL, "
+            f"deleted_at = COALESCE(s.deleted_at, :now) "
+            f"WHERE EXISTS (SELECT 1 FROM session t "
+            f"WHERE t.{digest} = s.{digest} AND t.id > s.id)"
+        ), {"now": now})
+        op.create_index(f'ix_session_{digest}', 'session', [digest], unique=True)
+        op.drop_column('session', raw)
+
+
+def downgrade() -> None:
+    # Raw tokens cannot be recovered, so every live session is ended
+    op.get_bind().execute(sa.text(
+        "UPDATE session SET deleted_at = :now WHERE deleted_at IS NULL"
+    ), {"now": settings.datetime_now})
+    for raw, digest in TOKEN_COLUMNS:
+        op.add_column('session', sa.Column(raw, sa.String()))
+        op.execute(f"UPDATE session SET {raw} = COALESCE({digest}, '')")
+        op.alter_column('session', raw, nullable=False)
+        op.drop_index(f'ix_session_{digest}', table_name='session')
+        op.drop_column('session', digest)
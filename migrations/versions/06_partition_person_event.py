@@ -0,0 +1,101 @@
+"""partition_person_event
+
+Revision ID: 06_partition_person_event
+Revises: 05_hashed_session_tokens
+Create Date: 2024-07-15 00:00:00.000000
+
+Rebuild person_event as a table range-partitioned by month on access_time.
+The primary key becomes (event_id, access_time) because unique constraints
+on a partitioned table must include the partition key. Months from the
+oldest event to PARTITION_AHEAD months ahead get their own partition; a
+default partition catches anything else until the scheduled task creates
+the matching month.
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '06_partition_person_event'
+down_revision = '05_hashed_session_tokens'
+branch_labels = None
+depends_on = None
+
+PARTITION_AHEAD = 3
+
+# (name, columns) recreated on the partitioned parent
+INDEXES = [
+    ('ix_person_event_person_id', ['person_id']),
+    ('ix_person_event_device_id', ['device_id']),
+    ('ix_person_event_access_time', ['access_time']),
+    ('ix_person_event_deleted_at', ['deleted_at']),
+    ('ix_person_event_person_time', ['person_id', 'access_time']),
+    ('ix_person_event_device_time', ['device_id', 'access_time']),
+]
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _months(first: datetime, last: datetime):
+    month = first.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _create_foreign_keys() -> None:
+    op.create_foreign_key('fk_person_event_person', 'person_event', 'person',
+                          ['person_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key('fk_person_event_device', 'person_event', 'camera',
+                          ['device_id'], ['id'], ondelete='SET NULL')
+
+
+def _create_indexes() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, 'person_event', columns)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute(
+        "CREATE TABLE person_event_partitioned "
+        "(LIKE person_event INCLUDING DEFAULTS) PARTITION BY RANGE (access_time)"
+    )
+    op.execute(
+        "ALTER TABLE person_event_partitioned "
+        "ADD CONSTRAINT person_event_partitioned_pkey PRIMARY KEY (event_id, access_time)"
+    )
+
+    now = datetime.utcnow()
+    oldest = conn.scalar(sa.text("SELECT min(access_time) FROM person_event")) or now
+    for month in _months(oldest, _add_months(now, PARTITION_AHEAD)):
+        name = f"person_event_y{month.year}m{month.month:02d}"
+        op.execute(
+            f"CREATE TABLE {name} PARTITION OF person_event_partitioned "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+        )
+    op.execute("CREATE TABLE person_event_default PARTITION OF person_event_partitioned DEFAULT")
+
+    op.execute("INSERT INTO person_event_partitioned SELECT * FROM person_event")
+    op.drop_table('person_event')
+    op.execute("ALTER TABLE person_event_partitioned RENAME TO person_event")
+    op.execute(
+        "ALTER TABLE person_event RENAME CONSTRAINT "
+        "person_event_partitioned_pkey TO person_event_pkey"
+    )
+    _create_indexes()
+    _create_foreign_keys()
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE person_event_plain (LIKE person_event INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO person_event_plain SELECT * FROM person_event")
+    op.execute("DROP TABLE person_event CASCADE")
+    op.execute("ALTER TABLE person_event_plain RENAME TO person_event")
+    op.create_primary_key('person_event_pkey', 'person_event', ['event_id'])
+    op.create_unique_constraint('uq_person_event_event_id', 'person_event', ['event_id'])
+    _create_indexes()
+    _create_foreign_keys()
@@ -0,0 +1,59 @@
+"""attendance_daily
+
+Revision ID: 07_attendance_daily
+Revises: 06_partition_person_event
+Create Date: 2024-07-22 00:00:00.000000
+
+Per person per day first/last access summary, backfilled from person_event
+and kept current as events are written.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '07_attendance_daily'
+down_revision = '06_partition_person_event'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attendance_daily',
+        sa.Column('person_id', sa.String(36), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('first_access', sa.DateTime(), nullable=False),
+        sa.Column('last_access', sa.DateTime(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('first_device_id', sa.Integer()),
+        sa.Column('last_device_id', sa.Integer()),
+        sa.Column('created_at', sa.DateTime(timezone=False),
+                  server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=False)),
+        sa.Column('deleted_at', sa.DateTime(timezone=False)),
+        sa.Column('status', sa.Boolean(), server_default='true'),
+        sa.PrimaryKeyConstraint('person_id', 'date'),
+        sa.ForeignKeyConstraint(['person_id'], ['person.id'], ondelete='CASCADE',
+                                name='fk_attendance_daily_person'),
+        sa.ForeignKeyConstraint(['first_device_id'], ['camera.id'], ondelete='SET NULL',
+                                name='fk_attendance_daily_first_device'),
+        sa.ForeignKeyConstraint(['last_device_id'], ['camera.id'], ondelete='SET NULL',
+                                name='fk_attendance_daily_last_device'),
+    )
+    op.create_index('ix_attendance_daily_date', 'attendance_daily', ['date'])
+
+    op.execute("""
+        INSERT INTO attendance_daily (person_id, date, first_access, last_access, count,
+                                      first_device_id, last_device_id)
+        SELECT person_id, access_time::date, min(access_time), max(access_time), count(*),
+               (array_agg(device_id ORDER BY access_time))[1],
+               (array_agg(device_id ORDER BY access_time DESC))[1]
+        FROM person_event
+        WHERE person_id IS NOT NULL AND deleted_at IS NULL
+        GROUP BY person_id, access_time::date
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_daily_date', table_name='attendance_daily')
+    op.drop_table('attendance_daily')
@@ -0,0 +1,46 @@
+"""person_event_id_ledger
+
+Revision ID: 08_person_event_id_ledger
+Revises: 07_attendance_daily
+Create Date: 2024-07-29 00:00:00.000000
+
+Keep event_id globally unique after partitioning. The person_event primary
+key is (event_id, access_time), so an unpartitioned ledger of event ids is
+claimed by every insert. Duplicates written since migration 06 keep their
+oldest row; the others are removed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '08_person_event_id_ledger'
+down_revision = '07_attendance_daily'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'person_event_id',
+        sa.Column('event_id', sa.String(36), primary_key=True),
+        sa.Column('access_time', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_person_event_id_access_time', 'person_event_id', ['access_time'])
+
+    op.execute("""
+        DELETE FROM person_event e
+        USING person_event keep
+        WHERE keep.event_id = e.event_id
+          AND (keep.access_time, keep.created_at) < (e.access_time, e.created_at)
+    """)
+    op.execute("""
+        INSERT INTO person_event_id (event_id, access_time)
+        SELECT DISTINCT ON (event_id) event_id, access_time
+        FROM person_event
+        ORDER BY event_id, access_time
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_person_event_id_access_time', table_name='person_event_id')
+    op.drop_table('person_event_id')
@@ -0,0 +1,6 @@
+import os
+from pathlib import Path
+
+# Build settings from the checked-in example plus environment overrides, so
+# the suite never needs (or reads) a developer's resources/configs/.env
+os.environ.setdefault("APP_ENV_FILE", str(Path(__file__).parent.parent / "env.example"))
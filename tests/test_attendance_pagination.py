@@ -0,0 +1,58 @@
+import asyncio
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+pytest.importorskip("aiosqlite")
+
+from app.core.database import Base
+from app.models import AttendanceDaily, Department, Person, PersonType, Unit
+from app.services.attendance import get_attendance
+
+TABLES = [Unit.__table__, Department.__table__, PersonType.__table__,
+          Person.__table__, AttendanceDaily.__table__]
+PERSONS = 3
+DAYS = 4
+
+
+async def _seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+        await conn.execute(insert(Unit), [{"id": 1, "name": "unit"}])
+        await conn.execute(insert(Department), [{"id": 1, "unit_id": 1, "name": "dept"}])
+        await conn.execute(insert(PersonType), [{"id": 1, "name": "staff"}])
+        await conn.execute(insert(Person), [
+            {"id": f"p{i}", "department_id": 1, "name": f"person {i}", "code": f"P{i}",
+             "image": f"p{i}.jpg", "feature": [0.0] * 4, "type": 1}
+            for i in range(PERSONS)])
+        start = datetime(2024, 1, 1, 8)
+        await conn.execute(insert(AttendanceDaily), [
+            {"person_id": f"p{i}", "date": (start + timedelta(days=d)).date(),
+             "first_access": start + timedelta(days=d),
+             "last_access": start + timedelta(days=d, hours=9), "count": 2}
+            for i in range(PERSONS) for d in range(DAYS)])
+
+
+async def _walk_pages(size: int) -> list:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    await _seed(engine)
+    keys, after = [], None
+    try:
+        async with AsyncSession(engine) as db:
+            while True:
+                page = await get_attendance(
+                    db, page_size=size, after=after, with_total=False,
+                    start_date=date(2024, 1, 1))
+                keys.extend((item.date, item.person_id) for item in page.items)
+                after = page.nextCursor
+                if after is None:
+                    return keys
+    finally:
+        await engine.dispose()
+
+
+def test_attendance_pages_through_every_row_with_after():
+    keys = asyncio.run(_walk_pages(5))
+    assert len(keys) == PERSONS * DAYS
+    assert keys == sorted(set(keys), reverse=True)
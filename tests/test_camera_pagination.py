@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+pytest.importorskip("aiosqlite")
+
+from app.core.database import Base
+from app.models import Area, Camera, Function, Server, Unit
+from app.models.associations import camera_function
+from app.services import base
+from app.services.camera import get_cameras
+
+TABLES = [Unit.__table__, Area.__table__, Server.__table__, Camera.__table__,
+          Function.__table__, camera_function]
+CAMERAS = 120
+
+
+async def _seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=TABLES)
+        await conn.execute(insert(Unit), [{"id": 1, "name": "unit"}])
+        await conn.execute(insert(Area), [
+            {"id": i, "unit_id": 1, "name": f"area {i}", "code": f"A{i}"} for i in range(1, 4)])
+        await conn.execute(insert(Server), [{"id": 1, "name": "server"}])
+        await conn.execute(insert(Function), [{"id": 1, "name": "checkin"}])
+        await conn.execute(insert(Camera), [
+            {"id": i, "area_id": i % 3 + 1, "server_id": 1, "name": f"cam {i}", "code": f"C{i}"}
+            for i in range(1, CAMERAS + 1)])
+        await conn.execute(insert(camera_function), [
+            {"camera_id": i, "function_id": 1} for i in range(1, CAMERAS + 1)])
+
+
+async def _count_statements(size: int) -> int:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    await _seed(engine)
+    # A cached count from the other run would skip a statement
+    base._count_cache.clear()
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda *args: statements.append(args[2]))
+    try:
+        async with AsyncSession(engine) as db:
+            page = await get_cameras(db, page=1, size=size)
+        assert len(page.items) == size
+        assert page.items[0].area_name and page.items[0].server_name
+        return len(statements)
+    finally:
+        await engine.dispose()
+
+
+def test_camera_page_statement_count_is_independent_of_page_size():
+    assert asyncio.run(_count_statements(1)) == asyncio.run(_count_statements(100))